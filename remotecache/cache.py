@@ -30,6 +30,8 @@
 import os
 import stat
 import hashlib
+from remotecache import vdf
+from y0 import aio
 
 # NOTE: This was written and tested on an install which has Steam Cloud saves
 # *disabled* -- I have no idea exactly how all the sync-state attributes work,
@@ -40,10 +42,30 @@ import hashlib
 # ALSO NOTE: Only tested/run on Linux.  I think it should work fine on other
 # platforms, but eh.
 
+# The async methods below run their blocking work through `y0.aio.run_io()`,
+# so they're subject to the same concurrency limit as the savefile I/O (see
+# `y0.aio.set_concurrency()`).  asyncio only gets imported when they're used,
+# since it's relatively expensive to import and most users of this module
+# don't need it.
+
 class CacheFile:
 
+    # The attributes we expect to find for every file, in the order in which
+    # Steam writes them out
+    known_keys = [
+            'root',
+            'size',
+            'localtime',
+            'time',
+            'remotetime',
+            'sha',
+            'syncstate',
+            'persiststate',
+            'platformstosync2',
+            ]
+
     def __init__(self, filename, path, root, size, localtime, time, remotetime,
-            sha, syncstate, persiststate, platformstosync2):
+            sha, syncstate, persiststate, platformstosync2, extra=None, key_order=None):
         self.filename = filename
         self.path = path
         self.root = root
@@ -56,34 +78,29 @@ class CacheFile:
         self.syncstate = syncstate
         self.persiststate = persiststate
         self.platformstosync2 = platformstosync2
+        # Any attributes we don't know about get passed through as-is
+        if extra is None:
+            self.extra = {}
+        else:
+            self.extra = extra
+        if key_order is None:
+            self.key_order = self.known_keys + list(self.extra.keys())
+        else:
+            self.key_order = key_order
 
     @staticmethod
-    def from_df(filename, path, df):
-        attrs = {}
-        for line in df:
-            line = line.strip()
-            if line == '{':
-                continue
-            elif line == '}':
-                break
-            parts = line.split("\t")
-            key = parts[0].strip('"')
-            val = parts[-1].strip('"')
-            attrs[key] = val
-        return CacheFile(filename,
-                path,
-                attrs['root'],
-                attrs['size'],
-                attrs['localtime'],
-                attrs['time'],
-                attrs['remotetime'],
-                attrs['sha'],
-                attrs['syncstate'],
-                attrs['persiststate'],
-                attrs['platformstosync2'],
-                )
-
-    def sync(self):
+    def from_attrs(filename, path, attrs):
+        """
+        Creates a CacheFile from a dict of attributes, as parsed by `remotecache.vdf`
+        """
+        try:
+            known = [attrs[key] for key in CacheFile.known_keys]
+        except KeyError as e:
+            raise vdf.VDFError('{} is missing attribute {}'.format(filename, e))
+        extra = {key: value for key, value in attrs.items() if key not in CacheFile.known_keys}
+        return CacheFile(filename, path, *known, extra=extra, key_order=list(attrs.keys()))
+
+    def sync(self, size=None, sha=None):
         # NOTE: the "time" field in remotecache.vdf is often not actually the
         # file's mtime -- it'll be a little bit *before* that.  Usually by just
         # a second or so, but I've seen a gap as high as 17 seconds.  No clue
@@ -92,36 +109,55 @@ class CacheFile:
         # that when syncing an otherwise unchanged file, that "time" parameter
         # could get updated.  (The "localtime" parameter *does* always match
         # the file's mtime, though.)
-        statinfo = os.stat(self.full_filename)
-        self.size = str(statinfo.st_size)
-        mtime = str(int(statinfo.st_mtime))
+        #
+        # If the caller already knows the file's size and SHA-1 (for instance
+        # because it just wrote the data out), those can be passed in, and
+        # we'll skip reading the whole file back in to hash it.
+        self.update(*CacheFile.file_info(self.full_filename, size=size, sha=sha))
+
+    @staticmethod
+    def file_info(full_filename, size=None, sha=None):
+        """
+        Returns the `(size, mtime, sha)` info for the given file, suitable for
+        passing to `update()`.  Split out from `sync()` so that the (relatively
+        expensive) work can be done elsewhere, such as in a worker process.
+        The file only gets read in if `sha` isn't passed in.
+        """
+        statinfo = os.stat(full_filename)
+        if size is None:
+            size = statinfo.st_size
+        if sha is None:
+            with open(full_filename, 'rb') as df:
+                sha = hashlib.sha1(df.read()).hexdigest()
+        return (size, statinfo.st_mtime, sha)
+
+    async def async_sync(self, executor=None, size=None, sha=None):
+        """
+        Like `sync()`, but the stat and SHA-1 hashing happen in an executor
+        so as not to block the event loop.
+        """
+        info = await aio.run_io(CacheFile.file_info, self.full_filename,
+                size=size, sha=sha, executor=executor)
+        self.update(*info)
+
+    def update(self, size, mtime, sha):
+        self.size = str(size)
+        mtime = str(int(mtime))
         self.localtime = mtime
         self.time = mtime
+        self.sha = sha
 
-        with open(self.full_filename, 'rb') as df:
-            self.sha = hashlib.sha1(df.read()).hexdigest()
+    def get_attrs(self):
+        attrs = {}
+        for key in self.key_order:
+            if key in self.extra:
+                attrs[key] = self.extra[key]
+            else:
+                attrs[key] = getattr(self, key)
+        return attrs
 
     def get_lines(self):
-        lines = []
-        lines.append("\t\"{}\"".format(self.filename))
-        lines.append("\t{")
-        for key in [
-                'root',
-                'size',
-                'localtime',
-                'time',
-                'remotetime',
-                'sha',
-                'syncstate',
-                'persiststate',
-                'platformstosync2',
-                ]:
-            lines.append("\t\t\"{}\"\t\t\"{}\"".format(
-                key,
-                getattr(self, key),
-                ))
-        lines.append("\t}")
-        return lines
+        return vdf.dump_pair(self.filename, self.get_attrs(), 1)
 
 class RemoteCache:
 
@@ -129,37 +165,62 @@ class RemoteCache:
         self.cache_filename = cache_filename
         self.cache_dir = os.path.abspath(os.path.dirname(cache_filename))
         self.files_dir = os.path.join(self.cache_dir, 'remote')
-        self.files = {}
-        with open(cache_filename) as df:
-            self.game_id = int(df.readline().strip().strip('"'))
-            df.readline()
-            change_num_split = df.readline().strip().split("\t")
-            assert(change_num_split[0] == '"ChangeNumber"')
-            self.change_num = int(change_num_split[-1].strip('"'))
-            next_line = df.readline().strip()
-            while next_line != '}':
-                inner_filename = next_line.strip('"')
-                file = CacheFile.from_df(inner_filename, self.files_dir, df)
-                self.files[file.filename] = file
-                next_line = df.readline().strip()
+        data = vdf.load(cache_filename)
+        if len(data) != 1:
+            raise vdf.VDFError('Expected a single top-level section in {}'.format(cache_filename))
+        game_id, self.root = next(iter(data.items()))
+        self.game_id = int(game_id)
+        if 'ChangeNumber' not in self.root:
+            raise vdf.VDFError('No ChangeNumber found in {}'.format(cache_filename))
+        self.change_num = int(self.root['ChangeNumber'])
+        # CacheFile objects only get created once they're asked for; until
+        # then, the raw attribute dicts in `root` are all we've got.
+        self._files = {}
+
+    @property
+    def files(self):
+        for key, value in self.root.items():
+            if isinstance(value, dict) and key not in self._files:
+                self._files[key] = CacheFile.from_attrs(key, self.files_dir, value)
+        return self._files
 
     def __getitem__(self, key):
-        return self.files[key]
+        if key not in self._files:
+            value = self.root[key]
+            if not isinstance(value, dict):
+                raise KeyError(key)
+            self._files[key] = CacheFile.from_attrs(key, self.files_dir, value)
+        return self._files[key]
 
     def __contains__(self, key):
-        return key in self.files
+        return isinstance(self.root.get(key), dict)
+
+    @classmethod
+    async def aload(cls, cache_filename, executor=None):
+        return await aio.run_io(cls, cache_filename, executor=executor)
 
     def sync_all(self):
         for file in self.files.values():
             file.sync()
 
+    async def async_sync_all(self, executor=None):
+        # Each sync waits its turn for the concurrency limit, so only that
+        # many files are being hashed at once
+        import asyncio
+        await asyncio.gather(*[file.async_sync(executor) for file in self.files.values()])
+
     def get_lines(self):
         lines = []
         lines.append('"{}"'.format(self.game_id))
         lines.append('{')
-        lines.append("\t\"ChangeNumber\"\t\t\"{}\"".format(self.change_num))
-        for file in self.files.values():
-            lines.extend(file.get_lines())
+        for key, value in self.root.items():
+            if key == 'ChangeNumber':
+                lines.extend(vdf.dump_pair(key, self.change_num, 1))
+            elif key in self._files:
+                lines.extend(self._files[key].get_lines())
+            else:
+                # Files we never touched, and anything else we don't know about
+                lines.extend(vdf.dump_pair(key, value, 1))
         lines.append('}')
         return lines
 
@@ -175,3 +236,6 @@ class RemoteCache:
     def overwrite(self):
         self.write_to(self.cache_filename)
 
+    async def async_overwrite(self, executor=None):
+        await aio.run_io(self.overwrite, executor=executor)
+
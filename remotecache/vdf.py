@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# vim: set expandtab tabstop=4 shiftwidth=4:
+
+# Copyright 2021 Christopher J. Kucera
+# <cj@apocalyptech.com>
+# <http://apocalyptech.com/contact.php>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the development team nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL CJ KUCERA BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import re
+
+# A small parser for Valve's text "KeyValues" format (VDF), as used by
+# `remotecache.vdf`.  The whole file gets parsed in a single pass into nested
+# dicts (which keep the original key order).  Since pretty much everything in
+# these files is quoted, we split the text on quote characters (which happens
+# at C speed), so the odd-numbered chunks are the quoted strings and the even-
+# numbered ones are just whitespace and braces.  Files with backslash escapes
+# or `//` comments in them take a slower regex-based path to do that split.
+#
+# String values are kept exactly as they appear in the file -- backslash
+# escapes are honored when finding the end of a quoted string, but they're
+# not otherwise interpreted, so writing the data back out reproduces the
+# original text.  Steam's conditional `[$WIN32]`-style tags aren't
+# supported, but they don't show up in `remotecache.vdf` anyway.
+
+class VDFError(Exception):
+    pass
+
+_split_re = re.compile(r'''
+    "(?P<quoted>[^"\\]*(?:\\.[^"\\]*)*)"
+    | //[^\n]*
+    ''', re.VERBOSE | re.DOTALL)
+
+def split_quoted(text):
+    """
+    Splits `text` into a list which alternates between unquoted and quoted
+    chunks (always starting and ending with an unquoted one), much like
+    `text.split('"')`, but handling escaped quotes and comments properly.
+    """
+    if '\\' not in text and '//' not in text:
+        parts = text.split('"')
+        if len(parts) % 2 == 0:
+            raise VDFError('Unterminated quoted string')
+        return parts
+    parts = []
+    between = []
+    pos = 0
+    for match in _split_re.finditer(text):
+        between.append(text[pos:match.start()])
+        pos = match.end()
+        if match.group('quoted') is not None:
+            parts.append(''.join(between))
+            parts.append(match.group('quoted'))
+            between = []
+        # Otherwise it's a comment, which just gets dropped
+    between.append(text[pos:])
+    parts.append(''.join(between))
+    for part in parts[0::2]:
+        if '"' in part:
+            raise VDFError('Unterminated quoted string')
+    return parts
+
+def loads(text):
+    """
+    Parses VDF text into nested dicts.
+    """
+    parts = split_quoted(text)
+    root = {}
+    stack = [root]
+    cur = root
+    key = None
+    # Tack a placeholder on the end so that the chunks all pair up
+    parts.append(None)
+    for between, quoted in zip(parts[0::2], parts[1::2]):
+        if between and not between.isspace():
+            for word in between.split():
+                if word.strip('{}'):
+                    # Unquoted string
+                    if '{' in word or '}' in word:
+                        raise VDFError('Unexpected brace in "{}"'.format(word))
+                    if key is None:
+                        key = word
+                    else:
+                        cur[key] = word
+                        key = None
+                    continue
+                for char in word:
+                    if char == '{':
+                        if key is None:
+                            raise VDFError('Found an opening brace without a key')
+                        section = {}
+                        cur[key] = section
+                        stack.append(section)
+                        cur = section
+                        key = None
+                    else:
+                        if key is not None or len(stack) == 1:
+                            raise VDFError('Found an unexpected closing brace')
+                        stack.pop()
+                        cur = stack[-1]
+        if quoted is None:
+            break
+        elif key is None:
+            key = quoted
+        else:
+            cur[key] = quoted
+            key = None
+    if key is not None or len(stack) != 1:
+        raise VDFError('Unexpected end of VDF data')
+    return root
+
+def load(filename):
+    with open(filename) as df:
+        return loads(df.read())
+
+def dump_pair(key, value, depth=0):
+    """
+    Returns the lines for a single key/value pair (where `value` may be a
+    dict), indented with `depth` tabs.
+    """
+    indent = "\t"*depth
+    if isinstance(value, dict):
+        lines = ["{}\"{}\"".format(indent, key), "{}{{".format(indent)]
+        for inner_key, inner_value in value.items():
+            lines.extend(dump_pair(inner_key, inner_value, depth+1))
+        lines.append("{}}}".format(indent))
+        return lines
+    else:
+        return ["{}\"{}\"\t\t\"{}\"".format(indent, key, value)]
+
+def dump_lines(data, depth=0):
+    lines = []
+    for key, value in data.items():
+        lines.extend(dump_pair(key, value, depth))
+    return lines
+
+def dumps(data):
+    return ''.join('{}\n'.format(line) for line in dump_lines(data))
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# vim: set expandtab tabstop=4 shiftwidth=4:
+
+# Copyright 2021 Christopher J. Kucera
+# <cj@apocalyptech.com>
+# <http://apocalyptech.com/contact.php>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the development team nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL CJ KUCERA BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import weakref
+import functools
+
+# Helpers for using the editor from asyncio code.  Savefile I/O and parsing
+# is all blocking, so it gets pushed off to an executor (the loop's default
+# one, unless told otherwise), with a limit on how many of those operations
+# can be in flight at once.  See `Savegame.aload()` and friends.
+#
+# asyncio itself is fairly expensive to import, and most uses of the editor
+# never touch it, so it only gets imported from inside the functions which
+# need it (by which point whoever's calling us has already imported it).
+
+DEFAULT_CONCURRENCY = 8
+
+_concurrency = DEFAULT_CONCURRENCY
+
+# asyncio Semaphores get bound to whichever loop first uses them, so we keep
+# one per loop.
+_semaphores = weakref.WeakKeyDictionary()
+
+def set_concurrency(limit):
+    """
+    Sets the maximum number of blocking savefile operations which can be
+    running at once.  Takes effect for operations started after this call.
+    """
+    global _concurrency
+    if limit < 1:
+        raise ValueError('Concurrency limit must be at least 1')
+    _concurrency = limit
+    _semaphores.clear()
+
+def get_concurrency():
+    return _concurrency
+
+def _get_semaphore(loop):
+    import asyncio
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(_concurrency)
+        _semaphores[loop] = semaphore
+    return semaphore
+
+async def run_io(func, *args, executor=None, **kwargs):
+    """
+    Runs the blocking `func(*args, **kwargs)` in an executor, subject to our
+    concurrency limit, and returns its result.
+    """
+    import asyncio
+    loop = asyncio.get_running_loop()
+    async with _get_semaphore(loop):
+        return await loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# vim: set expandtab tabstop=4 shiftwidth=4:
+
+# Copyright 2021 Christopher J. Kucera
+# <cj@apocalyptech.com>
+# <http://apocalyptech.com/contact.php>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the development team nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL CJ KUCERA BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+import io
+import os
+import sys
+import json
+import stat
+import signal
+import socket
+import traceback
+import contextlib
+import collections
+
+# Running `y0save.py` as a long-lived daemon, listening on a Unix domain
+# socket, so that scripts which call it over and over don't have to pay for
+# interpreter startup and loading the item registry every time.  Each
+# request is just the argv that `y0save.py` would have been run with (plus
+# the client's working directory), sent as a line of JSON, and the response
+# is the stdout/stderr output and exit status, also as a line of JSON.
+# Requests are handled one at a time.
+#
+# This module doesn't import anything from the rest of `y0`, so that the
+# client side (see `y0client.py`) starts up quickly.
+
+# How many of each kind of object `StatCache` keeps around by default
+MAX_ENTRIES = 64
+
+def stat_key(filename):
+    """
+    Returns the `(size, mtime_ns, ino)` we use to tell if a file's changed
+    """
+    statinfo = os.stat(filename)
+    return (statinfo.st_size, statinfo.st_mtime_ns, statinfo.st_ino)
+
+class StatCache:
+    """
+    Keeps recently-used objects loaded from files (Savegames, RemoteCaches)
+    around, so long as the files haven't changed on disk since.  Objects are
+    checked out with `take()` and handed back with `put()` once we're done
+    with them, so anything which doesn't get handed back (because something
+    went wrong partway through, say) just drops out of the cache.  `variant`
+    distinguishes different ways of loading the same file.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.entries = collections.OrderedDict()
+        # Stat keys for objects which are currently checked out
+        self.taken = {}
+
+    def take(self, filename, load, variant=None):
+        """
+        Returns the object for `filename`, calling `load()` to get a new one
+        if we don't have it, or if the file's changed since we stored it.
+        """
+        key = (os.path.abspath(filename), variant)
+        current = stat_key(filename)
+        entry = self.entries.pop(key, None)
+        if entry is not None and entry[0] == current:
+            obj = entry[1]
+        else:
+            obj = load()
+        self.taken[key] = current
+        return obj
+
+    def put(self, filename, obj, variant=None, changed=False):
+        """
+        Hands an object back to be cached.  If we've written the file out
+        ourselves (`changed`), its new stat info is used, otherwise the info
+        from when it was taken.
+        """
+        key = (os.path.abspath(filename), variant)
+        current = self.taken.pop(key, None)
+        if changed or current is None:
+            current = stat_key(filename)
+        self.entries[key] = (current, obj)
+        while len(self.entries) > self.max_entries:
+            self.discard(next(iter(self.entries)))
+
+    def forget(self, filename, variant=None):
+        """
+        Forgets about an object which was taken but isn't coming back (it's
+        up to the caller to close it, if need be)
+        """
+        self.taken.pop((os.path.abspath(filename), variant), None)
+
+    def discard(self, key):
+        current, obj = self.entries.pop(key)
+        if hasattr(obj, 'close'):
+            obj.close()
+
+    def clear(self):
+        while self.entries:
+            self.discard(next(iter(self.entries)))
+        self.taken = {}
+
+def send_message(conn, message):
+    conn.sendall(json.dumps(message, separators=(',', ':')).encode('utf-8') + b'\n')
+
+def recv_message(conn):
+    data = bytearray()
+    while not data.endswith(b'\n'):
+        chunk = conn.recv(65536)
+        if not chunk:
+            break
+        data.extend(chunk)
+    if not data:
+        raise ValueError('No data received')
+    return json.loads(data)
+
+def run_request(handler, argv, cwd=None):
+    """
+    Runs `handler(argv)` from the given working directory, capturing all its
+    output.  Returns the response to send back to the client.
+    """
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    status = 0
+    old_cwd = os.getcwd()
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+        try:
+            if cwd is not None:
+                os.chdir(cwd)
+            handler(argv)
+        except SystemExit as e:
+            if e.code is None:
+                status = 0
+            elif isinstance(e.code, int):
+                status = e.code
+            else:
+                print(e.code, file=sys.stderr)
+                status = 1
+        except Exception as e:
+            traceback.print_exc()
+            status = 1
+        finally:
+            os.chdir(old_cwd)
+    return {
+            'stdout': stdout.getvalue(),
+            'stderr': stderr.getvalue(),
+            'status': status,
+            }
+
+def serve(socket_path, handler):
+    """
+    Listens on the Unix domain socket at `socket_path`, passing the argv from
+    each request along to `handler`, until we're interrupted (or terminated --
+    SIGTERM is treated just like ctrl-C).  A stale socket left behind at that
+    path gets replaced.
+    """
+    if os.path.exists(socket_path):
+        if not stat.S_ISSOCK(os.stat(socket_path).st_mode):
+            raise RuntimeError('{} exists and is not a socket'.format(socket_path))
+        os.unlink(socket_path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    old_sigterm = signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        server.bind(socket_path)
+        server.listen()
+        while True:
+            conn, _ = server.accept()
+            with conn:
+                try:
+                    message = recv_message(conn)
+                    argv = message['argv']
+                except (ValueError, KeyError, TypeError, OSError) as e:
+                    continue
+                response = run_request(handler, argv, message.get('cwd'))
+                try:
+                    send_message(conn, response)
+                except OSError as e:
+                    pass
+    except KeyboardInterrupt:
+        pass
+    finally:
+        signal.signal(signal.SIGTERM, old_sigterm)
+        server.close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+def request(socket_path, argv, cwd=None):
+    """
+    Sends a request to the daemon listening at `socket_path`, returning its
+    `(stdout, stderr, status)`.  `cwd` defaults to our own working directory.
+    """
+    if cwd is None:
+        cwd = os.getcwd()
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+        conn.connect(socket_path)
+        send_message(conn, {'argv': argv, 'cwd': cwd})
+        response = recv_message(conn)
+    return response['stdout'], response['stderr'], response['status']
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+# vim: set expandtab tabstop=4 shiftwidth=4:
+
+# Copyright 2021 Christopher J. Kucera
+# <cj@apocalyptech.com>
+# <http://apocalyptech.com/contact.php>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the development team nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL CJ KUCERA BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import bisect
+from y0.layout import HEADER, KIRYU, MAJIMA, VOLATILE
+from y0.hostess import hostess_reg
+
+# Diffing of two savegames, with the differences annotated by which known
+# fields they fall in.  The data's compared in chunks first (which is cheap),
+# and only chunks which differ get looked at byte-by-byte.
+
+# Default chunk size for the initial comparison
+CHUNK_SIZE = 4096
+
+# Differing runs separated by this many identical bytes (or fewer) get merged
+MERGE_GAP = 3
+
+# Names of the values within a single inventory record, by byte offset
+item_record_fields = [
+    (0, 2, 'item_id'),
+    (2, 4, 'strikes'),
+    (4, 6, 'ammo'),
+    (6, 8, 'qty'),
+    (8, 16, 'unknown'),
+    ]
+
+class FieldMap:
+    """
+    Maps savefile offsets to the names of the fields which live there, built
+    from the layouts in `y0.layout` and the hostess registry.
+    """
+
+    def __init__(self):
+        regions = []
+
+        def add_layout(layout, prefix):
+            for field in layout:
+                for idx, pos in enumerate(field.positions):
+                    if field.is_block:
+                        for start, end, name in item_record_fields:
+                            regions.append((pos+start, pos+end, '{}{} slot {} ({})'.format(
+                                prefix, field.label, idx+1, name)))
+                    else:
+                        if field.count == 1:
+                            name = field.name
+                        elif isinstance(field.label, list):
+                            name = '{}[{}]'.format(field.name, field.label[idx])
+                        else:
+                            name = '{}[{}]'.format(field.name, idx)
+                        regions.append((pos, pos+field.size, prefix + name))
+
+        add_layout(HEADER, '')
+        add_layout(KIRYU, 'Kiryu ')
+        add_layout(MAJIMA, 'Majima ')
+        for hostess in hostess_reg:
+            regions.append((hostess.xp_pos, hostess.xp_pos+4, 'Hostess {} XP'.format(hostess.name)))
+            regions.append((hostess.sales_pos, hostess.sales_pos+4, 'Hostess {} sales'.format(hostess.name)))
+
+        regions.sort()
+        self.regions = regions
+        self.starts = [region[0] for region in regions]
+        # None of our regions are all that big, so this bounds how far back
+        # we have to look for ones which overlap a given range.
+        self.max_len = max(end-start for start, end, name in regions)
+
+    def lookup(self, start, end):
+        """
+        Returns the names of all the fields which overlap the given range
+        """
+        names = []
+        idx = bisect.bisect_left(self.starts, start-self.max_len)
+        while idx < len(self.regions) and self.regions[idx][0] < end:
+            region_start, region_end, name = self.regions[idx]
+            if region_end > start:
+                names.append(name)
+            idx += 1
+        return names
+
+_field_map = None
+
+def get_field_map():
+    global _field_map
+    if _field_map is None:
+        _field_map = FieldMap()
+    return _field_map
+
+# Offsets where volatile regions start or end.  Diff ranges never straddle
+# one of these, so that each range is either entirely volatile or not at all.
+volatile_boundaries = sorted({pos for start, end, desc in VOLATILE for pos in (start, end)})
+
+def crosses_volatile(start, end):
+    """
+    Returns `True` if a volatile region starts or ends inside `start`-`end`
+    """
+    idx = bisect.bisect_right(volatile_boundaries, start)
+    return idx < len(volatile_boundaries) and volatile_boundaries[idx] < end
+
+def split_at_volatile(start, end):
+    """
+    Splits the range `start`-`end` at any volatile region boundaries inside it,
+    returning a list of `(start, end)` tuples
+    """
+    pieces = []
+    idx = bisect.bisect_right(volatile_boundaries, start)
+    while idx < len(volatile_boundaries) and volatile_boundaries[idx] < end:
+        pieces.append((start, volatile_boundaries[idx]))
+        start = volatile_boundaries[idx]
+        idx += 1
+    pieces.append((start, end))
+    return pieces
+
+def volatile_regions(start, end):
+    """
+    Returns the descriptions of any volatile regions which overlap the given
+    range
+    """
+    return [desc for vol_start, vol_end, desc in VOLATILE if vol_start < end and vol_end > start]
+
+class DiffRange:
+    """
+    A single run of differing bytes
+    """
+
+    def __init__(self, start, end, old, new, fields, volatile):
+        self.start = start
+        self.end = end
+        self.old = old
+        self.new = new
+        self.fields = fields
+        self.volatile = volatile
+
+    def __len__(self):
+        return self.end - self.start
+
+    def report(self, max_bytes=16):
+        lines = []
+        if self.fields:
+            fields = ', '.join(self.fields)
+        else:
+            fields = 'unknown'
+        lines.append('0x{:05X}-0x{:05X} ({} byte{}): {}'.format(
+            self.start, self.end-1, len(self), '' if len(self) == 1 else 's', fields))
+        if self.volatile:
+            lines.append('  (volatile: {})'.format(', '.join(self.volatile)))
+        for label, data in [('-', self.old), ('+', self.new)]:
+            hex_str = data[:max_bytes].hex(' ')
+            if len(data) > max_bytes:
+                hex_str += ' ...'
+            elif not data:
+                hex_str = '(none)'
+            lines.append('  {} {}'.format(label, hex_str))
+        return lines
+
+    def __repr__(self):
+        return 'DiffRange<0x{:X}-0x{:X}>'.format(self.start, self.end)
+
+def diff_buffers(old, new, chunk_size=CHUNK_SIZE, merge_gap=MERGE_GAP, base=0):
+    """
+    Compares two savegame buffers (anything supporting the buffer protocol,
+    such as bytes, bytearrays, or mmaps), returning a list of `DiffRange`s.
+    Differing runs which are `merge_gap` bytes apart or less are reported
+    as a single range.  If the buffers are different lengths, the extra data
+    is reported as a final range.  If the buffers are just a piece of a
+    savefile, `base` is the offset they start at, so that the ranges (and
+    their field names) line up with the file.
+    """
+    old_view = memoryview(old)
+    new_view = memoryview(new)
+    common = min(len(old_view), len(new_view))
+    field_map = get_field_map()
+
+    # First find the differing byte runs, only looking closely at chunks
+    # which don't match.
+    runs = []
+    run_start = None
+    for chunk_start in range(0, common, chunk_size):
+        chunk_end = min(chunk_start+chunk_size, common)
+        if old_view[chunk_start:chunk_end] == new_view[chunk_start:chunk_end]:
+            if run_start is not None:
+                runs.append((run_start, chunk_start))
+                run_start = None
+            continue
+        old_chunk = bytes(old_view[chunk_start:chunk_end])
+        new_chunk = bytes(new_view[chunk_start:chunk_end])
+        for offset, (old_byte, new_byte) in enumerate(zip(old_chunk, new_chunk)):
+            if old_byte != new_byte:
+                if run_start is None:
+                    run_start = chunk_start+offset
+            elif run_start is not None:
+                runs.append((run_start, chunk_start+offset))
+                run_start = None
+    if run_start is not None:
+        runs.append((run_start, common))
+
+    # Multibyte values often have some bytes which didn't change, so join up
+    # runs which are only separated by a few bytes -- but keep volatile and
+    # non-volatile bytes apart, so that ignoring the volatile ones doesn't
+    # hide real changes right next to them.
+    merged = []
+    for run_start, run_end in runs:
+        for start, end in split_at_volatile(base+run_start, base+run_end):
+            start -= base
+            end -= base
+            if (merged and start - merged[-1][1] <= merge_gap
+                    and not crosses_volatile(base+merged[-1][0], base+end)):
+                merged[-1] = (merged[-1][0], end)
+            else:
+                merged.append((start, end))
+    runs = merged
+
+    if len(old_view) != len(new_view):
+        runs.append((common, max(len(old_view), len(new_view))))
+
+    return [DiffRange(base+start, base+end,
+                bytes(old_view[start:end]),
+                bytes(new_view[start:end]),
+                field_map.lookup(base+start, base+end),
+                volatile_regions(base+start, base+end))
+            for start, end in runs]
+
+def diff_files(old_filename, new_filename, **kwargs):
+    """
+    Compares two savefiles, returning a list of `DiffRange`s.  Any extra
+    args are passed along to `diff_buffers()`.
+    """
+    with open(old_filename, 'rb') as df:
+        old = df.read()
+    with open(new_filename, 'rb') as df:
+        new = df.read()
+    return diff_buffers(old, new, **kwargs)
+
+def report(ranges, ignore_volatile=False):
+    """
+    Prints out a list of `DiffRange`s
+    """
+    shown = 0
+    for diff_range in ranges:
+        if ignore_volatile and diff_range.volatile:
+            continue
+        for line in diff_range.report():
+            print(line)
+        shown += 1
+    if shown == 0:
+        print('No differences found')
+    return shown
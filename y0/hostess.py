@@ -28,6 +28,8 @@
 # SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 
+from y0.layout import HOSTESSES
+
 class HostessDesc:
     """
     Description of a hostess in Y0, intended to be used by code which
@@ -36,13 +38,14 @@ class HostessDesc:
 
     """
 
-    def __init__(self, hostess_id, name, xp_pos, sales_pos,
+    def __init__(self, hostess_id, name,
             max_level=30 # Max of all hostesses lower than platinum
             ):
         self.hostess_id = hostess_id
         self.name = name
-        self.xp_pos = xp_pos
-        self.sales_pos = sales_pos
+        # Savefile positions come from `y0.layout.HOSTESSES`
+        self.xp_pos = HOSTESSES['xp'].position(hostess_id-1)
+        self.sales_pos = HOSTESSES['sales'].position(hostess_id-1)
         self.max_level = max_level
 
     def __repr__(self):
@@ -72,36 +75,36 @@ class HostessRegistry:
 
 hostess_reg = HostessRegistry()
 
-hostess_reg.add( 1, 'Yuki',       0x277E8, 0x277F0, max_level=40)
-hostess_reg.add( 2, 'Chika',      0x27818, 0x27820, max_level=40)
-hostess_reg.add( 3, 'Mana',       0x27848, 0x27850, max_level=40)
-hostess_reg.add( 4, 'Ai',         0x27878, 0x27880, max_level=40)
-hostess_reg.add( 5, 'Hibiki',     0x278A8, 0x278B0, max_level=40)
-hostess_reg.add( 6, 'Saki',       0x278D8, 0x278E0, max_level=40)
-hostess_reg.add( 7, 'Miss Isobe', 0x27908, 0x27910)
-hostess_reg.add( 8, 'Etsuko',     0x27938, 0x27940)
-hostess_reg.add( 9, 'Dolly',      0x27968, 0x27970)
-hostess_reg.add(10, 'Unknown',    0x27998, 0x279A0)
-hostess_reg.add(11, 'Seiko',      0x279C8, 0x279D0)
-hostess_reg.add(12, 'Akina',      0x279F8, 0x27A00)
-hostess_reg.add(13, 'Koizumi',    0x27A28, 0x27A30)
-hostess_reg.add(14, 'Shizuka',    0x27A58, 0x27A60)
-hostess_reg.add(15, 'Erranda',    0x27A88, 0x27A90)
-hostess_reg.add(16, 'Kiyoko',     0x27AB8, 0x27AC0)
-hostess_reg.add(17, 'Junko',      0x27AE8, 0x27AF0)
-hostess_reg.add(18, 'Shiho',      0x27B18, 0x27B20)
-hostess_reg.add(19, 'Shinomi',    0x27B48, 0x27B50)
-hostess_reg.add(20, 'Akemi',      0x27B78, 0x27B80)
-hostess_reg.add(21, 'Hiroko',     0x27BA8, 0x27BB0)
-hostess_reg.add(22, 'Harumi',     0x27BD8, 0x27BE0)
-hostess_reg.add(23, 'Endo',       0x27C08, 0x27C10)
-hostess_reg.add(24, 'Namiko',     0x27C38, 0x27C40)
-hostess_reg.add(25, 'Kirara',     0x27C68, 0x27C70)
-hostess_reg.add(26, 'Ume',        0x27C98, 0x27CA0)
-hostess_reg.add(27, 'Marilyn',    0x27CC8, 0x27CD0)
-hostess_reg.add(28, 'Chizu',      0x27CF8, 0x27D00)
-hostess_reg.add(29, 'Mitsuko',    0x27D28, 0x27D30)
-hostess_reg.add(30, 'Fusae',      0x27D58, 0x27D60)
+hostess_reg.add( 1, 'Yuki', max_level=40)
+hostess_reg.add( 2, 'Chika', max_level=40)
+hostess_reg.add( 3, 'Mana', max_level=40)
+hostess_reg.add( 4, 'Ai', max_level=40)
+hostess_reg.add( 5, 'Hibiki', max_level=40)
+hostess_reg.add( 6, 'Saki', max_level=40)
+hostess_reg.add( 7, 'Miss Isobe')
+hostess_reg.add( 8, 'Etsuko')
+hostess_reg.add( 9, 'Dolly')
+hostess_reg.add(10, 'Unknown')
+hostess_reg.add(11, 'Seiko')
+hostess_reg.add(12, 'Akina')
+hostess_reg.add(13, 'Koizumi')
+hostess_reg.add(14, 'Shizuka')
+hostess_reg.add(15, 'Erranda')
+hostess_reg.add(16, 'Kiyoko')
+hostess_reg.add(17, 'Junko')
+hostess_reg.add(18, 'Shiho')
+hostess_reg.add(19, 'Shinomi')
+hostess_reg.add(20, 'Akemi')
+hostess_reg.add(21, 'Hiroko')
+hostess_reg.add(22, 'Harumi')
+hostess_reg.add(23, 'Endo')
+hostess_reg.add(24, 'Namiko')
+hostess_reg.add(25, 'Kirara')
+hostess_reg.add(26, 'Ume')
+hostess_reg.add(27, 'Marilyn')
+hostess_reg.add(28, 'Chizu')
+hostess_reg.add(29, 'Mitsuko')
+hostess_reg.add(30, 'Fusae')
 
 
 # Create some potentially-useful mappings
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# vim: set expandtab tabstop=4 shiftwidth=4:
+
+# Copyright 2021 Christopher J. Kucera
+# <cj@apocalyptech.com>
+# <http://apocalyptech.com/contact.php>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the development team nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL CJ KUCERA BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+# NumPy is optional -- the rest of the editor doesn't need it, it's only
+# required if you want to use InventoryArray.
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from y0.layout import ITEM, get_codec
+
+# Matches the record format in `y0.layout.ITEM`
+if np is not None:
+    ITEM_DTYPE = np.dtype([
+        ('item_id', '<u2'),
+        ('strikes', '<i2'),
+        ('ammo', '<i2'),
+        ('qty', '<u2'),
+        ('unknown', '<u8'),
+        ])
+    assert(ITEM_DTYPE.itemsize == get_codec(ITEM).size)
+else:
+    ITEM_DTYPE = None
+
+class InventoryArray:
+    """
+    A NumPy structured-array view of an Inventory's records, for when you want
+    to crunch through lots of slots at once rather than going through a
+    SaveItem per slot.  `records` is backed directly by the savegame's buffer
+    (no copying), so it's best treated as read-only: to make changes, modify
+    a copy of it and hand that to `write()`, which goes through the Datafile
+    like any other edit (so it'll show up in a recorded patch, for instance).
+    If you do write to `records` directly, call `mark_dirty()` afterwards so
+    that the change gets written out and the Inventory re-decodes its items.
+    That can't be done while a patch is being recorded, though, since the
+    original data's already gone by then.
+
+    Note that a memory-mapped save can't be closed while one of these views
+    is still around.
+    """
+
+    def __init__(self, inv):
+        if np is None:
+            raise RuntimeError('NumPy is required to use InventoryArray')
+        self.inv = inv
+        self.records = np.frombuffer(inv.df.data,
+                dtype=ITEM_DTYPE,
+                count=inv.count,
+                offset=inv.base_pos,
+                )
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def occupied(self):
+        """
+        Boolean mask of slots which have any data in them at all.
+        """
+        raw = self.records.view('<u8').reshape(len(self.records), 2)
+        return raw.any(axis=1)
+
+    def free_slots(self):
+        """
+        Array of indexes of all the empty slots.
+        """
+        return np.flatnonzero(~self.occupied)
+
+    def counts(self, by_qty=False):
+        """
+        Returns a dict mapping item IDs to the number of slots they occupy, or
+        to their total quantity, if `by_qty` is set.
+        """
+        occupied = self.records[self.occupied]
+        if by_qty:
+            totals = np.bincount(occupied['item_id'], weights=occupied['qty'])
+        else:
+            totals = np.bincount(occupied['item_id'])
+        ids = np.flatnonzero(totals)
+        return {int(item_id): int(totals[item_id]) for item_id in ids}
+
+    def clamp_qty(self, max_qty, min_qty=1):
+        """
+        Clamps the quantity of every occupied slot to be within `min_qty` and
+        `max_qty`.  Returns the number of slots which were changed.
+        """
+        occupied = self.occupied
+        qty = self.records['qty']
+        clamped = np.clip(qty, min_qty, max_qty)
+        changed = occupied & (clamped != qty)
+        num_changed = int(changed.sum())
+        if num_changed:
+            records = self.records.copy()
+            records['qty'][changed] = clamped[changed]
+            self.write(records)
+        return num_changed
+
+    def write(self, records):
+        """
+        Writes a modified copy of `records` back into the save, and gets the
+        Inventory to re-decode its SaveItems next time they're needed.
+        """
+        if records.dtype != ITEM_DTYPE or len(records) != len(self.records):
+            raise ValueError('Records must match the layout and size of {}'.format(self.inv.label))
+        self.inv.df.seek(self.inv.base_pos)
+        self.inv.df.write(records.tobytes())
+        self.inv.refresh()
+
+    def mark_dirty(self):
+        """
+        Flags our whole block as modified in the underlying Datafile, and gets
+        the Inventory to re-decode its SaveItems next time they're needed.
+        """
+        if self.inv.df.recorder is not None:
+            raise RuntimeError('Direct changes to {} records cannot be recorded in a patch; use write() instead'.format(
+                self.inv.label))
+        start = self.inv.base_pos
+        self.inv.df.mark_dirty(start, start + self.records.nbytes)
+        self.inv.refresh()
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+# vim: set expandtab tabstop=4 shiftwidth=4:
+
+# Copyright 2021 Christopher J. Kucera
+# <cj@apocalyptech.com>
+# <http://apocalyptech.com/contact.php>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the development team nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL CJ KUCERA BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import struct
+
+# The savefiles are just a big blob of data at fixed offsets, so this module
+# is where we keep track of what lives where.  Everything's described as a
+# list of `Field`s grouped into `Layout`s, which get compiled once into a
+# single decoder apiece, so filling in a Savegame (or a Char, etc) only takes
+# one struct unpack per Layout.
+
+# Cache of compiled little-endian struct.Struct objects, keyed by format
+_codecs = {}
+
+def get_codec(vartype):
+    """
+    Returns a (cached) compiled little-endian `struct.Struct` for the given
+    format string, so we're not re-parsing the format on every read/write.
+    """
+    try:
+        return _codecs[vartype]
+    except KeyError:
+        codec = struct.Struct('<{}'.format(vartype))
+        _codecs[vartype] = codec
+        return codec
+
+class FieldReader:
+    """
+    Decodes a whole list of `(vartype, pos)` fields from a buffer in a single
+    pass, by compiling them into one struct which skips over the bytes in
+    between.  Values are returned in the same order the fields were given.
+    If any fields overlap, we can't do that, and fall back to decoding each
+    field individually.
+    """
+
+    def __init__(self, fields):
+        self.fields = tuple(fields)
+        self.order = sorted(range(len(self.fields)), key=lambda idx: self.fields[idx][1])
+        self.base = self.fields[self.order[0]][1] if self.fields else 0
+        fmt = []
+        cur_pos = self.base
+        for idx in self.order:
+            vartype, pos = self.fields[idx]
+            if pos < cur_pos:
+                fmt = None
+                break
+            if pos > cur_pos:
+                fmt.append('{}x'.format(pos-cur_pos))
+            fmt.append(vartype)
+            cur_pos = pos + get_codec(vartype).size
+        if fmt is None:
+            self.codec = None
+        else:
+            self.codec = get_codec(''.join(fmt))
+
+    def read(self, buf):
+        if self.codec is None:
+            return [get_codec(vartype).unpack_from(buf, pos)[0] for vartype, pos in self.fields]
+        values = [None]*len(self.fields)
+        for idx, value in zip(self.order, self.codec.unpack_from(buf, self.base)):
+            values[idx] = value
+        return values
+
+# Cache of FieldReaders, keyed by their field tuples
+_field_readers = {}
+
+def get_field_reader(fields):
+    fields = tuple(fields)
+    try:
+        return _field_readers[fields]
+    except KeyError:
+        reader = FieldReader(fields)
+        _field_readers[fields] = reader
+        return reader
+
+# Format of a single 16-byte inventory record: item_id, strikes, ammo, qty, unknown
+ITEM = 'HhhHQ'
+
+class Field:
+    """
+    A named value at a fixed offset in the savefile.  `vartype` is a struct
+    format (always little-endian).  If `count` is greater than 1, the field is
+    an array of `count` values, `stride` bytes apart (by default they're packed
+    right next to each other).  Formats like `32s` are treated as fixed-size
+    NUL-terminated strings, and `ITEM` fields are inventory blocks, which
+    don't get decoded along with the rest (see `Inventory`).  `label` is a
+    human-readable name for the field -- for arrays it can be a list with one
+    label per element.
+    """
+
+    def __init__(self, name, vartype, offset, count=1, stride=None, label=None):
+        self.name = name
+        self.vartype = vartype
+        self.offset = offset
+        self.count = count
+        self.size = get_codec(vartype).size
+        if stride is None:
+            self.stride = self.size
+        else:
+            self.stride = stride
+        self.label = label
+        self.is_str = vartype.endswith('s')
+        self.is_block = vartype == ITEM
+
+    def position(self, idx=0):
+        return self.offset + self.stride*idx
+
+    @property
+    def positions(self):
+        return [self.position(idx) for idx in range(self.count)]
+
+    def pack(self, value):
+        """
+        Encodes a single value of this field (a single element, for arrays).
+        Strings can be given as `str` or `bytes`, and get NUL-padded.
+        """
+        if self.is_str and isinstance(value, str):
+            value = value.encode('utf-8')
+        return get_codec(self.vartype).pack(value)
+
+    def pack_into(self, buf, value, idx=0):
+        """
+        Encodes a single value of this field straight into `buf`
+        """
+        pos = self.position(idx)
+        buf[pos:pos+self.size] = self.pack(value)
+
+    def __repr__(self):
+        return 'Field<{},{},0x{:X}>'.format(self.name, self.vartype, self.offset)
+
+class Layout:
+    """
+    A group of Fields which get decoded together.  When a Layout is created, all
+    of its non-block fields are compiled into a single FieldReader, so `decode()`
+    is just one pass over the buffer.  `end` is the offset just past the last
+    byte of those fields, so `decode()` only needs a buffer that big.
+    """
+
+    def __init__(self, name, fields):
+        self.name = name
+        self.fields = {}
+        for field in fields:
+            if field.name in self.fields:
+                raise RuntimeError('Duplicate field name in {} layout: {}'.format(name, field.name))
+            self.fields[field.name] = field
+        self.scalars = [f for f in self.fields.values() if not f.is_block]
+        self.blocks = [f for f in self.fields.values() if f.is_block]
+        self.flat_fields = [(f.vartype, pos) for f in self.scalars for pos in f.positions]
+        self.reader = get_field_reader(self.flat_fields)
+        self.end = max((f.position(f.count-1)+f.size for f in self.scalars), default=0)
+
+    def __getitem__(self, key):
+        return self.fields[key]
+
+    def __contains__(self, key):
+        return key in self.fields
+
+    def __iter__(self):
+        return iter(self.fields.values())
+
+    def group(self, values):
+        """
+        Given a flat list of values (in `flat_fields` order), returns a dict
+        of them keyed by field name, with array fields as lists.
+        """
+        result = {}
+        idx = 0
+        for field in self.scalars:
+            field_values = values[idx:idx+field.count]
+            idx += field.count
+            if field.is_str:
+                field_values = [v.split(b'\0', 1)[0].decode('utf-8') for v in field_values]
+            if field.count == 1:
+                result[field.name] = field_values[0]
+            else:
+                result[field.name] = field_values
+        return result
+
+    def decode(self, buf):
+        """
+        Decodes all our non-block fields from `buf`, returning a dict keyed by
+        field name.
+        """
+        return self.group(self.reader.read(buf))
+
+    def encode(self, values):
+        """
+        The other direction from `decode()`: given a dict of values keyed by
+        field name (with lists for array fields), returns the `(pos, data)`
+        pairs to write.  Only the fields which are given get encoded.
+        """
+        chunks = []
+        for name, value in values.items():
+            field = self.fields[name]
+            if field.is_block:
+                raise ValueError('Cannot encode {} block field {}'.format(self.name, name))
+            if field.count == 1:
+                value = [value]
+            elif len(value) != field.count:
+                raise ValueError('{} field {} needs {} values'.format(self.name, name, field.count))
+            for idx, element in enumerate(value):
+                chunks.append((field.position(idx), field.pack(element)))
+        return chunks
+
+    def pack_into(self, buf, values):
+        """
+        Encodes the given values (see `encode()`) straight into `buf`
+        """
+        for pos, data in self.encode(values):
+            buf[pos:pos+len(data)] = data
+
+# General savegame info, at the top of the file.
+#  - `cur_char` probably doesn't actually *control* who the active character
+#    is, but it's at least a convenient string to display.  (The datetime
+#    which follows it caps its length.)
+#  - Likewise, I wouldn't be surprised if `chapter` was just there for the
+#    "load" dialog to show info to the user.  It's zero-indexed.
+#  - `saved` is year, month, day-of-week, day, hours, minutes, seconds
+#  - `played` is total time played, in thirds of milliseconds
+#  - `difficulty1` and `difficulty2` should always match
+HEADER = Layout('header', [
+    Field('chapter', 'B', 0x6),
+    Field('cur_char', '32s', 0x8),
+    Field('saved', 'H', 0x28, count=7),
+    Field('difficulty1', 'B', 0x444),
+    Field('difficulty2', 'B', 0x445),
+    Field('played', 'Q', 0x448),
+    ])
+
+# Character data.  The field names here are the attribute names used on `Char`.
+# `unknown_money_1` and `unknown_money_2` appear to be "counters" of some sort,
+# for various kinds of money made.  I think unknown1 is all-time income, which
+# includes Mr. Shakedown (SaveData0004.sav has 10t-1 in there, where the
+# current-money var is just 1M).
+KIRYU = Layout('kiryu', [
+    Field('money', 'Q', 0xF2C0),
+    Field('unknown_money_1', 'Q', 0xF2D0),
+    Field('unknown_money_2', 'Q', 0xF2E0),
+    Field('cp', 'H', 0xF3E0),
+    Field('skills_spent', 'Q', 0x72F0, count=4,
+        label=['Brawler', 'Rush', 'Beast', 'Dragon']),
+    Field('inv_item', ITEM, 0x07AAC, count=20, label='Item Inv'),
+    Field('inv_weap', ITEM, 0x0CE6C, count=15, label='Weapon Inv'),
+    Field('inv_gear', ITEM, 0x0D04C, count=15, label='Gear Inv'),
+    Field('inv_val', ITEM, 0x07D3C, count=25, label='Valuables'),
+    Field('inv_box_item', ITEM, 0x0836C, count=200, label='Item Box'),
+    Field('inv_box_weap', ITEM, 0x09C6C, count=200, label='Weapon Box'),
+    Field('inv_box_gear', ITEM, 0x0B56C, count=200, label='Gear Box'),
+    Field('inv_special', ITEM, 0x0D86C, count=113, label='Pocket Circuit'),
+    ])
+
+MAJIMA = Layout('majima', [
+    Field('money', 'Q', 0xF2C8),
+    Field('unknown_money_1', 'Q', 0xF2D8),
+    Field('unknown_money_2', 'Q', 0xF2E8),
+    Field('cp', 'H', 0xF3E8),
+    # This isn't the order in which they're shown on the screen, btw!
+    Field('skills_spent', 'Q', 0x76F0, count=4,
+        label=['Thug', 'Breaker', 'Slugger', 'Mad Dog']),
+    Field('inv_item', ITEM, 0x07BEC, count=20, label='Item Inv'),
+    Field('inv_weap', ITEM, 0x0CF5C, count=15, label='Weapon Inv'),
+    Field('inv_gear', ITEM, 0x0D13C, count=15, label='Gear Inv'),
+    Field('inv_val', ITEM, 0x0805C, count=25, label='Valuables'),
+    Field('inv_box_item', ITEM, 0x08FEC, count=200, label='Item Box'),
+    Field('inv_box_weap', ITEM, 0x0A8EC, count=200, label='Weapon Box'),
+    Field('inv_box_gear', ITEM, 0x0C1EC, count=200, label='Gear Box'),
+    Field('inv_special', ITEM, 0x0D22C, count=96, label='Crafting'),
+    ])
+
+# Cabaret hostesses, indexed by hostess ID minus one
+HOSTESSES = Layout('hostesses', [
+    Field('xp', 'I', 0x277E8, count=30, stride=0x30),
+    Field('sales', 'I', 0x277F0, count=30, stride=0x30),
+    ])
+
+# Regions which change with every save, whether or not anything's really
+# changed -- see the notes in `Savegame.__init__()`.  Sizes aren't known for
+# sure for all of these.  Each entry is `(start, end, description)`, with
+# `end` being exclusive.
+VOLATILE = [
+    (HEADER['saved'].offset, HEADER['saved'].position(HEADER['saved'].count), 'save timestamp'),
+    (HEADER['played'].offset, HEADER['played'].offset+HEADER['played'].size, 'time played'),
+    (0x06EAC, 0x06EAE, 'unknown (possibly Kiryu-specific)'),
+    (0x06F98, 0x06FB4, 'character position/rotation'),
+    (0x0F6DC, 0x0F6E4, 'unknown'),
+    (0x11178, 0x11180, '30-minute countdown timer'),
+    (0x1AA39, 0x1AA3A, 'unknown small counter'),
+    ]
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# vim: set expandtab tabstop=4 shiftwidth=4:
+
+# Copyright 2021 Christopher J. Kucera
+# <cj@apocalyptech.com>
+# <http://apocalyptech.com/contact.php>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the development team nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL CJ KUCERA BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import re
+import bisect
+
+# A bunch of items share a name with some other item, and are only told apart
+# by the source in parentheses at the end of their name ("Chasu Ramen" versus
+# "Chasu Ramen (Kinryu Ramen)" and "Chasu Ramen (Tengokuken)", for instance --
+# see `item_notes.txt`).  The index here keeps track of those groupings so that
+# lookups can be narrowed down with qualifiers, and offers prefix and fuzzy
+# matching for when an exact name isn't known.
+#
+# Qualifiers go in square brackets after the name, and can be either an item
+# type or (part of) the source:
+#
+#     Chasu Ramen [menu]
+#     Oolong Tea [yoronotaki]
+#     Chasu Ramen [menu] [kinryu]
+
+source_re = re.compile(r'^(?P<base>.*?)\s*\((?P<source>[^()]*)\)$')
+qualifier_re = re.compile(r'\[([^\]]*)\]')
+
+def normalize(name):
+    """
+    Normalizes a name for lookups: lowercased, with whitespace collapsed, and
+    "smart" apostrophes straightened out.
+    """
+    return ' '.join(name.replace('’', "'").lower().split())
+
+def split_source(name):
+    """
+    Splits a (normalized) name into its base name and source, if it has one
+    """
+    if match := source_re.match(name):
+        return match.group('base'), match.group('source')
+    return name, ''
+
+def parse_query(query):
+    """
+    Splits a lookup string into its name and a list of qualifiers
+    """
+    qualifiers = [normalize(q) for q in qualifier_re.findall(query)]
+    name = normalize(qualifier_re.sub(' ', query))
+    return name, [q for q in qualifiers if q]
+
+def trigrams(name):
+    padded = '  {} '.format(name)
+    return {padded[idx:idx+3] for idx in range(len(padded)-2)}
+
+class ItemNameIndex:
+    """
+    Name lookups for a set of ItemDescs.  Everything gets built up front, so
+    queries don't have to walk the whole item list.
+    """
+
+    def __init__(self, items):
+        self.by_name = {}
+        self.by_base = {}
+        self.sources = {}
+        self.grams = {}
+        self.gram_counts = {}
+        for item in items:
+            name = normalize(item.name)
+            base, source = split_source(name)
+            self.by_name[name] = item
+            self.by_base.setdefault(base, []).append(item)
+            self.sources[item.item_id] = source
+            item_grams = trigrams(name)
+            self.gram_counts[item.item_id] = len(item_grams)
+            for gram in item_grams:
+                self.grams.setdefault(gram, []).append(item)
+        self.by_base = {base: tuple(group) for base, group in self.by_base.items()}
+        self.sorted_names = sorted(self.by_name)
+
+    def exact(self, name):
+        """
+        Returns the item with exactly the given name (case-insensitively), or
+        `None`
+        """
+        return self.by_name.get(normalize(name))
+
+    def same_name(self, name):
+        """
+        Returns all the items which share the given name, once their sources
+        have been stripped off
+        """
+        return self.by_base.get(split_source(normalize(name))[0], ())
+
+    def duplicates(self):
+        """
+        Returns a dict of all names which are shared by more than one item
+        """
+        return {base: group for base, group in self.by_base.items() if len(group) > 1}
+
+    def source(self, item):
+        """
+        Returns the source given in the item's name (or an empty string)
+        """
+        return self.sources.get(item.item_id, '')
+
+    def matches_qualifier(self, item, qualifier):
+        return (qualifier == item.item_type.name.lower()
+                or qualifier == item.item_type.value.lower()
+                or qualifier in self.source(item))
+
+    def prefix(self, prefix, limit=None):
+        """
+        Returns the items whose names start with the given prefix, in
+        alphabetical order
+        """
+        prefix = normalize(prefix)
+        results = []
+        idx = bisect.bisect_left(self.sorted_names, prefix)
+        while idx < len(self.sorted_names) and self.sorted_names[idx].startswith(prefix):
+            results.append(self.by_name[self.sorted_names[idx]])
+            if limit is not None and len(results) >= limit:
+                break
+            idx += 1
+        return results
+
+    def fuzzy(self, query, limit=5, cutoff=0.4):
+        """
+        Returns up to `limit` items whose names are similar to the given
+        query, as a list of `(score, item)` tuples, best match first.  Scores
+        are the Dice coefficient of the names' trigrams, from 0 to 1.
+        """
+        query_grams = trigrams(normalize(query))
+        if not query_grams:
+            return []
+        shared = {}
+        items = {}
+        for gram in query_grams:
+            for item in self.grams.get(gram, ()):
+                shared[item.item_id] = shared.get(item.item_id, 0) + 1
+                items[item.item_id] = item
+        scored = []
+        for item_id, count in shared.items():
+            score = 2*count/(len(query_grams)+self.gram_counts[item_id])
+            if score >= cutoff:
+                scored.append((score, item_id))
+        scored.sort(key=lambda pair: (-pair[0], pair[1]))
+        return [(score, items[item_id]) for score, item_id in scored[:limit]]
+
+    def resolve(self, query):
+        """
+        Returns the items which the given lookup string (which may contain
+        qualifiers) refers to.  An exact name match wins unless qualifiers are
+        given; otherwise every item sharing the name is considered, and then
+        narrowed down by the qualifiers.  If more than one item is returned,
+        the lookup was ambiguous.
+        """
+        name, qualifiers = parse_query(query)
+        exact = self.by_name.get(name)
+        if exact is not None and not qualifiers:
+            return (exact,)
+        candidates = list(self.same_name(name))
+        if exact is not None and exact not in candidates:
+            candidates.append(exact)
+        for qualifier in qualifiers:
+            candidates = [item for item in candidates if self.matches_qualifier(item, qualifier)]
+        return tuple(sorted(candidates, key=lambda item: item.item_id))
+
+    def suggest(self, query, limit=5):
+        """
+        Returns some items which might've been meant by a lookup which didn't
+        resolve: prefix matches if there are any, otherwise fuzzy ones.
+        """
+        name = parse_query(query)[0]
+        results = self.prefix(name, limit=limit)
+        if not results:
+            results = [item for score, item in self.fuzzy(name, limit=limit)]
+        return results
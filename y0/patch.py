@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# vim: set expandtab tabstop=4 shiftwidth=4:
+
+# Copyright 2021 Christopher J. Kucera
+# <cj@apocalyptech.com>
+# <http://apocalyptech.com/contact.php>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the development team nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL CJ KUCERA BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+import os
+import struct
+from y0.diff import DiffRange, diff_buffers, volatile_regions
+
+# Recording edits as patches which can be replayed against other savefiles.
+# A `PatchRecorder` gets hooked into a `Datafile` (see
+# `Datafile.start_recording()`) and keeps the original bytes of everything
+# that gets written.  Once we're done, those are compared with the final
+# data to build a `Patch`: a list of `y0.diff.DiffRange`s, each with the
+# old and new bytes and the names of the fields they're in.  Applying a
+# Patch to another file is just a handful of preads (to check that the old
+# bytes match, if wanted) and pwrites, without parsing the save at all.
+
+class PatchMismatchException(Exception):
+    pass
+
+class PatchRecorder:
+    """
+    Keeps track of the original contents of every range written to a
+    Datafile while we're hooked up to it.
+    """
+
+    def __init__(self):
+        self.writes = []
+
+    def record(self, start, old):
+        self.writes.append((start, old))
+
+    def finish(self, data):
+        """
+        Builds a `Patch` from the writes we've seen, given the data as it
+        stands now.  Bytes which were written more than once keep their
+        very first value as the "old" one, and anything which ended up
+        unchanged gets left out.
+        """
+        ranges = []
+        for start, end in sorted((start, start+len(old)) for start, old in self.writes):
+            if ranges and start <= ranges[-1][1]:
+                ranges[-1][1] = max(ranges[-1][1], end)
+            else:
+                ranges.append([start, end])
+
+        entries = []
+        for start, end in ranges:
+            new = bytes(data[start:end])
+            old = bytearray(new)
+            for write_start, write_old in reversed(self.writes):
+                if start <= write_start < end:
+                    old[write_start-start:write_start-start+len(write_old)] = write_old
+            entries.extend(diff_buffers(old, new, base=start))
+        return Patch(entries)
+
+class Patch:
+    """
+    A list of changes to make to a savefile.  On disk, a patch is a small
+    header (magic, version, and number of changes), followed by each change:
+    its offset, its length, the length of its field names, the old bytes,
+    the new bytes, and the field names (NUL-separated UTF-8).
+    """
+
+    magic = b'Y0PATCH\0'
+    version = 1
+    header_codec = struct.Struct('<8sHI')
+    entry_codec = struct.Struct('<IIH')
+
+    def __init__(self, entries=None):
+        if entries is None:
+            self.entries = []
+        else:
+            self.entries = entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def write_to(self, filename):
+        with open(filename, 'wb') as odf:
+            odf.write(self.header_codec.pack(self.magic, self.version, len(self.entries)))
+            for entry in self.entries:
+                fields = '\0'.join(entry.fields).encode('utf-8')
+                odf.write(self.entry_codec.pack(entry.start, len(entry), len(fields)))
+                odf.write(entry.old)
+                odf.write(entry.new)
+                odf.write(fields)
+
+    @classmethod
+    def load(cls, filename):
+        with open(filename, 'rb') as df:
+            data = df.read()
+        if not data.startswith(cls.magic):
+            raise ValueError('{} is not a Y0 patch file'.format(filename))
+        try:
+            magic, version, count = cls.header_codec.unpack_from(data)
+            if version != cls.version:
+                raise ValueError('{} is an unknown patch version ({})'.format(filename, version))
+            pos = cls.header_codec.size
+            entries = []
+            for _ in range(count):
+                start, length, fields_len = cls.entry_codec.unpack_from(data, pos)
+                pos += cls.entry_codec.size
+                old = data[pos:pos+length]
+                new = data[pos+length:pos+length*2]
+                fields = data[pos+length*2:pos+length*2+fields_len].decode('utf-8')
+                pos += length*2 + fields_len
+                if len(new) != length or pos > len(data):
+                    raise ValueError('{} is truncated'.format(filename))
+                entries.append(DiffRange(start, start+length, old, new,
+                    fields.split('\0') if fields else [],
+                    volatile_regions(start, start+length)))
+        except struct.error:
+            raise ValueError('{} is truncated'.format(filename))
+        return cls(entries)
+
+    def apply(self, filename, check=True):
+        """
+        Applies the patch to the given file, in-place.  If `check` is set,
+        the file's current contents have to match the old bytes of every
+        change, or a `PatchMismatchException` is raised and nothing gets
+        written.  Regardless of `check`, the file has to be big enough for
+        every change, since the patch never makes files bigger.
+        """
+        fd = os.open(filename, os.O_RDWR)
+        try:
+            size = os.fstat(fd).st_size
+            for entry in self.entries:
+                if entry.end > size:
+                    raise PatchMismatchException('{} is too small for the patch at 0x{:05X} ({})'.format(
+                        filename, entry.start, ', '.join(entry.fields) or 'unknown'))
+            if check:
+                for entry in self.entries:
+                    if os.pread(fd, len(entry), entry.start) != entry.old:
+                        raise PatchMismatchException('{} does not match the patch at 0x{:05X} ({})'.format(
+                            filename, entry.start, ', '.join(entry.fields) or 'unknown'))
+            for entry in self.entries:
+                os.pwrite(fd, entry.new, entry.start)
+        finally:
+            os.close(fd)
+
+    def report(self):
+        """
+        Prints out the changes in the patch
+        """
+        for entry in self.entries:
+            for line in entry.report():
+                print(line)
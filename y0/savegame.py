@@ -30,10 +30,15 @@
 import os
 import io
 import re
-import struct
-from . import PC
-from y0.itemregistry import ItemType, reg, items_by_id, items_by_name
+import mmap
+import bisect
+import hashlib
+import functools
+from . import PC, aio
+from y0.layout import get_codec, ITEM, HEADER, KIRYU, MAJIMA, HOSTESSES
+from y0.itemregistry import ItemType, reg
 from y0.hostess import hostess_reg, hostesses_by_id, hostesses_by_name, xp_levels
+from y0.patch import PatchRecorder
 
 # So it looks like these files are unencrypted and uncompressed,
 # all the info *appears* to be stored at absolute positions in
@@ -60,11 +65,14 @@ class PosAttr:
     references.
     """
 
-    def __init__(self, df, vartype, pos):
+    def __init__(self, df, vartype, pos, value=None):
         self.df = df
         self.vartype = vartype
         self.pos = pos
-        self._value = self.df.read_val(self.vartype, self.pos)
+        if value is None:
+            self._value = self.df.read_val(self.vartype, self.pos)
+        else:
+            self._value = value
 
     def __str__(self):
         return self.val
@@ -86,63 +94,179 @@ class PosAttr:
 
 class Datafile:
 
-    _type_len = {
-            'b': 1,
-            'B': 1,
-            'h': 2,
-            'H': 2,
-            'i': 4,
-            'I': 4,
-            'q': 8,
-            'Q': 8,
-            'f': 4,
-            'd': 8,
-            }
-
-    def __init__(self, filename):
+    def __init__(self, filename, use_mmap=False, readonly=False):
+        """
+        By default we read the whole file into memory and `overwrite()` writes
+        the whole thing back out.  If `use_mmap` is set, the file is memory-mapped
+        instead, so reads and writes go straight to the mapping and `overwrite()`
+        just flushes the pages we've touched.  Note that with a writable mapping,
+        any changes end up in the file even if `overwrite()` never gets called!
+        If `readonly` is set as well, the file is mapped read-only, which lets
+        multiple processes which are only reading saves share the same pages.
+        """
         self.filename = filename
-        with open(self.filename, 'rb') as df:
-            self.df = io.BytesIO(df.read())
+        self.use_mmap = use_mmap
+        self.readonly = readonly
+        self.pos = 0
+        # Sorted, non-overlapping (start, end) byte ranges which have been
+        # modified since the file was loaded (or last written out)
+        self.dirty_ranges = []
+        # If set, a `y0.patch.PatchRecorder` which gets told about every write
+        self.recorder = None
+        if self.use_mmap:
+            if self.readonly:
+                mode, access = 'rb', mmap.ACCESS_READ
+            else:
+                mode, access = 'r+b', mmap.ACCESS_WRITE
+            with open(self.filename, mode) as df:
+                # Empty files can't be mapped (and certainly aren't savegames)
+                if os.fstat(df.fileno()).st_size == 0:
+                    raise NotASavegameException()
+                self.data = mmap.mmap(df.fileno(), 0, access=access)
+        else:
+            with open(self.filename, 'rb') as df:
+                self.data = bytearray(df.read())
+
+    def __enter__(self):
+        return self
 
-    # Remnants of supporting `with Datafile('filename') as df`, when I was
-    # writing directly to the file instead of using io.BytesIO in the middle
-    #def __enter__(self):
-    #    self.df = open(self.filename, 'r+b')
-    #    return self
+    def __exit__(self, exit_type, value, traceback):
+        self.close()
 
-    #def __exit__(self, exit_type, value, traceback):
-    #    self.df.close()
+    def close(self):
+        if self.use_mmap and not self.data.closed:
+            self.data.close()
 
-    #def close(self):
-    #    self.df.close()
+    def __len__(self):
+        return len(self.data)
 
     def tell(self):
-        return self.df.tell()
+        return self.pos
 
     def seek(self, pos, whence=io.SEEK_SET):
-        self.df.seek(pos, whence)
+        if whence == io.SEEK_CUR:
+            pos += self.pos
+        elif whence == io.SEEK_END:
+            pos += len(self.data)
+        if pos < 0:
+            raise ValueError('Negative seek position {}'.format(pos))
+        self.pos = pos
 
     def read(self, size=-1):
-        return self.df.read(size)
+        if size is None or size < 0:
+            end = len(self.data)
+        else:
+            end = min(self.pos+size, len(self.data))
+        if end <= self.pos:
+            return b''
+        data = bytes(self.data[self.pos:end])
+        self.pos = end
+        return data
+
+    def read_at(self, pos, size):
+        """
+        Reads `size` bytes from `pos` without touching our current position.
+        """
+        return bytes(self.data[pos:pos+size])
 
     def write(self, b):
-        self.df.write(b)
+        end = self.pos + len(b)
+        if end > len(self.data):
+            if self.use_mmap:
+                raise ValueError('Cannot write past the end of a memory-mapped file')
+            self.data.extend(bytes(end - len(self.data)))
+        if self.recorder is not None:
+            self.recorder.record(self.pos, bytes(self.data[self.pos:end]))
+        self.data[self.pos:end] = b
+        self.mark_dirty(self.pos, end)
+        self.pos = end
+
+    def start_recording(self):
+        """
+        Starts keeping track of everything written to us, so that the changes
+        can be turned into a `y0.patch.Patch` by `stop_recording()`.
+        """
+        self.recorder = PatchRecorder()
+
+    def stop_recording(self):
+        """
+        Stops recording, and returns a `y0.patch.Patch` of all the changes
+        made since `start_recording()` was called.
+        """
+        recorder = self.recorder
+        self.recorder = None
+        return recorder.finish(self.data)
+
+    def mark_dirty(self, start, end):
+        """
+        Records the byte range `start`-`end` as modified, merging it into any
+        existing ranges which it overlaps or butts up against.
+        """
+        if end <= start:
+            return
+        ranges = self.dirty_ranges
+        idx = bisect.bisect_left(ranges, (start, start))
+        if idx > 0 and ranges[idx-1][1] >= start:
+            idx -= 1
+            start = ranges[idx][0]
+        last = idx
+        while last < len(ranges) and ranges[last][0] <= end:
+            end = max(end, ranges[last][1])
+            last += 1
+        ranges[idx:last] = [(start, end)]
 
     def read_val(self, vartype, pos=None):
-        if pos is not None:
-            self.seek(pos)
-        # Little-endian
-        return struct.unpack('<{}'.format(vartype), self.read(self._type_len[vartype]))[0]
+        codec = get_codec(vartype)
+        if pos is None:
+            pos = self.pos
+        value = codec.unpack_from(self.data, pos)[0]
+        self.pos = pos + codec.size
+        return value
 
     def write_val(self, vartype, new_val, pos=None):
         if pos is not None:
             self.seek(pos)
-        # Little-endian
-        self.write(struct.pack('<{}'.format(vartype), new_val))
+        self.write(get_codec(vartype).pack(new_val))
+
+    def write_field(self, field, value, idx=0):
+        """
+        Writes a single value of a `y0.layout.Field` (or one element of it, for
+        arrays)
+        """
+        self.seek(field.position(idx))
+        self.write(field.pack(value))
+
+    def write_layout(self, layout, values):
+        """
+        Writes a dict of values for a `y0.layout.Layout`'s fields, as encoded
+        by `Layout.encode()`
+        """
+        for pos, data in layout.encode(values):
+            self.seek(pos)
+            self.write(data)
 
     def new_attr(self, vartype, pos):
         return PosAttr(self, vartype, pos)
 
+    def layout_attrs(self, layout):
+        """
+        Decodes all the non-block fields of a `y0.layout.Layout` in one pass,
+        returning a dict keyed by field name.  Numeric fields come back as
+        PosAttrs (or lists of PosAttrs, for arrays); strings are just strings.
+        """
+        values = layout.decode(self.data)
+        attrs = {}
+        for field in layout.scalars:
+            value = values[field.name]
+            if field.is_str:
+                attrs[field.name] = value
+            elif field.count == 1:
+                attrs[field.name] = PosAttr(self, field.vartype, field.offset, value)
+            else:
+                attrs[field.name] = [PosAttr(self, field.vartype, pos, val)
+                        for pos, val in zip(field.positions, value)]
+        return attrs
+
     def i8_attr(self, pos):
         return self.new_attr('b', pos)
 
@@ -213,7 +337,7 @@ class Datafile:
         into any infinite loops.
         """
         if pos is not None:
-            self.df.seek(pos)
+            self.seek(pos)
         data = []
         while True:
             char = self.read(1)
@@ -226,9 +350,8 @@ class Datafile:
 
     def read_datetime(self, pos=None):
         if pos is not None:
-            self.df.seek(pos)
-        (year, month, day_of_week, day) = struct.unpack('<HHHH', self.df.read(8))
-        (hours, mins, secs) = struct.unpack('<HHH', self.df.read(6))
+            self.seek(pos)
+        (year, month, day_of_week, day, hours, mins, secs) = get_codec('HHHHHHH').unpack(self.read(14))
         return (year, month, day_of_week, day, hours, mins, secs)
 
     def read_millis_as_seconds(self, pos=None):
@@ -238,51 +361,92 @@ class Datafile:
         """
         return self.read_u64(pos)/3/1000
 
+    def sha1(self):
+        """
+        SHA-1 hex digest of our current contents.  After `overwrite()` (or if
+        nothing's been changed), that's the same as the file's digest, without
+        having to read the file back in.
+        """
+        return hashlib.sha1(self.data).hexdigest()
+
     def write_to(self, filename):
-        self.seek(0)
         with open(filename, 'wb') as odf:
-            odf.write(self.read())
+            odf.write(self.data)
 
     def overwrite(self):
-        self.write_to(self.filename)
+        """
+        Writes our changes back to the file we were loaded from.  Only the
+        modified ranges get written, so this assumes that nothing else has
+        touched the file since we loaded it.  (If the file's size doesn't match
+        ours anymore, we'll fall back to writing the whole thing.)
+        """
+        if self.use_mmap:
+            # mmap flushes need to start on a page boundary
+            for start, end in self.dirty_ranges:
+                aligned = start - (start % mmap.ALLOCATIONGRANULARITY)
+                self.data.flush(aligned, end-aligned)
+        elif os.path.getsize(self.filename) != len(self.data):
+            self.write_to(self.filename)
+        elif self.dirty_ranges:
+            with open(self.filename, 'r+b') as odf:
+                fd = odf.fileno()
+                with memoryview(self.data) as view:
+                    for start, end in self.dirty_ranges:
+                        if hasattr(os, 'pwrite'):
+                            os.pwrite(fd, view[start:end], start)
+                        else:
+                            odf.seek(start)
+                            odf.write(view[start:end])
+        self.dirty_ranges = []
 
 class SaveItem:
+    """
+    A single inventory record.  There are a lot of these per save, so they're
+    kept small: just the raw record values, with `has_data` and `item_desc`
+    worked out from those when asked for (the ItemDescs themselves are shared
+    from the registry).
+    """
+
+    __slots__ = ('item_id', 'qty', 'strikes', 'ammo', 'unknown')
 
     def __init__(self, item_id, qty, strikes, ammo, unknown):
-        global items_by_id
         self.item_id = item_id
         self.qty = qty
         self.strikes = strikes
         self.ammo = ammo
         self.unknown = unknown
-        self._update_has_data()
-        if self.item_id in items_by_id:
-            self.item_desc = items_by_id[self.item_id]
-        else:
-            self.item_desc = None
 
-    def _update_has_data(self):
-        self.has_data = not all([v == 0 for v in [
-                self.item_id,
-                self.qty,
-                self.ammo,
-                self.strikes,
-                self.unknown,
-                ]])
+    @property
+    def has_data(self):
+        return bool(self.item_id or self.qty or self.ammo or self.strikes or self.unknown)
+
+    @property
+    def item_desc(self):
+        global reg
+        return reg.get(self.item_id)
+
+    # Layout of a single 16-byte inventory record
+    codec = get_codec(ITEM)
 
     @staticmethod
     def from_df(df):
-        item_id, strikes, ammo, qty, unknown = struct.unpack('<HhhHQ', df.read(16))
+        item_id, strikes, ammo, qty, unknown = SaveItem.codec.unpack(df.read(SaveItem.codec.size))
         return SaveItem(item_id, qty, strikes, ammo, unknown)
 
-    def update(self, df, item_id, item_desc, qty, ammo, strikes):
+    def set(self, item_id, item_desc, qty, ammo, strikes):
+        """
+        Updates our in-memory values only (see `update()` to write them out too).
+        `item_desc` is accepted for symmetry with `update()`, but our
+        description always comes from the registry, by ID.
+        """
         self.item_id = item_id
-        self.item_desc = item_desc
         self.qty = qty
         self.ammo = ammo
         self.strikes = strikes
-        self._update_has_data()
-        df.write(struct.pack('<HhhHQ',
+
+    def update(self, df, item_id, item_desc, qty, ammo, strikes):
+        self.set(item_id, item_desc, qty, ammo, strikes)
+        df.write(SaveItem.codec.pack(
             self.item_id,
             self.strikes,
             self.ammo,
@@ -343,112 +507,188 @@ class SaveItem:
                 extras_str,
                 )
 
-class CharPositions:
-
-    def __init__(self, money=0, unknown_money_1=0, unknown_money_2=0,
-            cp=0,
-            skill_1=(0, 'Foo'),
-            skill_2=(0, 'Bar'),
-            skill_3=(0, 'Baz'),
-            skill_4=(0, 'Frotz'),
-            inv_item=0,
-            inv_weapon=0,
-            inv_gear=0,
-            box_item=0,
-            box_weapon=0,
-            box_gear=0,
-            val=0,
-            special_label=None,
-            special=0,
-            special_qty=0,
-            ):
-        self.money = money
-        self.unknown_money_1 = unknown_money_1
-        self.unknown_money_2 = unknown_money_2
-        self.cp = cp
-        self.skill_1 = skill_1
-        self.skill_2 = skill_2
-        self.skill_3 = skill_3
-        self.skill_4 = skill_4
-        self.inv_item = inv_item
-        self.inv_weapon = inv_weapon
-        self.inv_gear = inv_gear
-        self.box_item = box_item
-        self.box_weapon = box_weapon
-        self.box_gear = box_gear
-        self.val = val
-        self.special_label = special_label
-        self.special = special
-        self.special_qty = special_qty
-        self.skills = [
-                self.skill_1,
-                self.skill_2,
-                self.skill_3,
-                self.skill_4,
-                ]
-
 class Inventory:
+    """
+    A block of inventory records.  The records themselves aren't decoded into
+    SaveItems until something actually asks for `items`, so loading a save
+    (or just editing money/CP) doesn't have to pay for all of them.
+
+    We also keep a bitmap of which slots are free (bit N set means slot N is
+    empty), which gets kept up to date as items are written, so finding the
+    next open slot doesn't require scanning the whole inventory.
+    """
+
+    # Each record viewed as a pair of u64s, for quick emptiness checks
+    _raw_codec = get_codec('QQ')
 
     def __init__(self, label, df, base_pos, count):
         self.label = label
         self.df = df
         self.base_pos = base_pos
         self.count = count
-        self.items = []
-        df.seek(base_pos)
-        for _ in range(self.count):
-            self.items.append(SaveItem.from_df(df))
+        self._items = None
+        self._free_mask = None
+
+    @property
+    def items(self):
+        if self._items is None:
+            block = self.df.read_at(self.base_pos, SaveItem.codec.size*self.count)
+            self._items = [SaveItem(item_id, qty, strikes, ammo, unknown)
+                    for item_id, strikes, ammo, qty, unknown in SaveItem.codec.iter_unpack(block)]
+        return self._items
+
+    def __len__(self):
+        return self.count
+
+    def refresh(self):
+        """
+        Throws away any decoded SaveItems, so they'll get re-read from the
+        savegame the next time they're needed.  Only really necessary if
+        you've been poking at the data without going through this class.
+        """
+        self._items = None
+        self._free_mask = None
+
+    @property
+    def free_mask(self):
+        if self._free_mask is None:
+            mask = 0
+            if self._items is None:
+                block = self.df.read_at(self.base_pos, SaveItem.codec.size*self.count)
+                for idx, (first, second) in enumerate(self._raw_codec.iter_unpack(block)):
+                    if first == 0 and second == 0:
+                        mask |= 1 << idx
+            else:
+                for idx, item in enumerate(self._items):
+                    if not item.has_data:
+                        mask |= 1 << idx
+            self._free_mask = mask
+        return self._free_mask
+
+    def first_free(self):
+        """
+        Returns the index of the first empty slot, or `None` if we're full.
+        """
+        mask = self.free_mask
+        if mask == 0:
+            return None
+        return (mask & -mask).bit_length()-1
+
+    def free_count(self):
+        return bin(self.free_mask).count('1')
+
+    @property
+    def is_full(self):
+        return self.free_mask == 0
+
+    def _update_free(self, idx, has_data):
+        if self._free_mask is not None:
+            if has_data:
+                self._free_mask &= ~(1 << idx)
+            else:
+                self._free_mask |= 1 << idx
+
+    def as_array(self):
+        """
+        Returns a `y0.invarray.InventoryArray` view of this inventory (which
+        requires NumPy).
+        """
+        from y0.invarray import InventoryArray
+        return InventoryArray(self)
 
     def report(self):
+        Inventory.report_items(self.label, enumerate(self.items))
+
+    @staticmethod
+    def report_items(label, items):
+        """
+        Prints out a report for the given `(idx, SaveItem)` pairs, which don't
+        necessarily have to come from a live Inventory (see `y0.summary`).
+        """
         reported = False
-        for idx, item in enumerate(self.items):
+        for idx, item in items:
             if item.has_data:
-                print('{} {}: {}'.format(self.label, idx+1, item.report()))
+                print('{} {}: {}'.format(label, idx+1, item.report()))
                 reported = True
         if not reported:
-            print('No {}!'.format(self.label))
+            print('No {}!'.format(label))
         print('')
 
     def overwrite_item_at(self, idx, *args, **kwargs):
-        if idx >= len(self.items):
+        if idx >= self.count:
             print('ERROR: specified index ({}) is too high for {}'.format(idx, self.label))
         else:
+            item = self.items[idx]
             self.df.seek(self.base_pos + (16*idx))
-            self.items[idx].update(self.df, *args, **kwargs)
+            item.update(self.df, *args, **kwargs)
+            self._update_free(idx, item.has_data)
+
+    def write_items(self, updates):
+        """
+        Writes a bunch of items at once.  `updates` is a dict mapping slot
+        indexes to `(item_id, item_desc, qty, ammo, strikes)` tuples (the same
+        args `overwrite_item_at()` takes).  All the modified records get
+        written as a single contiguous chunk, rather than one write per item.
+        """
+        if not updates:
+            return
+        rec_size = SaveItem.codec.size
+        first = min(updates)
+        last = max(updates)
+        if first < 0 or last >= self.count:
+            raise IndexError('Slot index out of range for {}'.format(self.label))
+        start = self.base_pos + first*rec_size
+        block = bytearray(self.df.read_at(start, (last-first+1)*rec_size))
+        for idx, (item_id, item_desc, qty, ammo, strikes) in updates.items():
+            offset = (idx-first)*rec_size
+            # The "unknown" field is left as-is
+            unknown = SaveItem.codec.unpack_from(block, offset)[4]
+            SaveItem.codec.pack_into(block, offset, item_id, strikes, ammo, qty, unknown)
+            if self._items is not None:
+                self._items[idx].set(item_id, item_desc, qty, ammo, strikes)
+            self._update_free(idx, any([item_id, qty, ammo, strikes, unknown]))
+        self.df.seek(start)
+        self.df.write(block)
 
     def clear_all(self):
         self.df.seek(self.base_pos)
-        for item in self.items:
-            item.clear(self.df)
+        if self._items is None:
+            # Nothing's been decoded yet, so blank the records in one go,
+            # leaving the "unknown" field as-is (as `SaveItem.clear()` does)
+            rec_size = SaveItem.codec.size
+            block = bytearray(self.df.read_at(self.base_pos, rec_size*self.count))
+            for offset in range(0, len(block), rec_size):
+                unknown = SaveItem.codec.unpack_from(block, offset)[4]
+                SaveItem.codec.pack_into(block, offset, 0, 0, 0, 0, unknown)
+            self.df.write(block)
+        else:
+            for item in self._items:
+                item.clear(self.df)
+        # Records with a nonzero "unknown" field still count as occupied, so
+        # the free slots get worked out again from what's there now
+        self._free_mask = None
 
 class Char:
 
-    def __init__(self, df, chartype, positions):
+    def __init__(self, df, chartype, layout):
         self.df = df
         self.chartype = chartype
         self.name = chartype.value
-        self.pos = positions
-        self.skills_spent = []
-
-        self.money = self.df.u64_attr(self.pos.money)
-        # These two appear to be "counters" of some sort, for various kinds of
-        # money made.  I think unknown1 is all-time income, which includes
-        # Mr. Shakedown (SaveData0004.sav has 10t-1 in there, where the current-
-        # money var is just 1M).
-        self.unknown_money_1 = self.df.u64_attr(self.pos.unknown_money_1)
-        self.unknown_money_2 = self.df.u64_attr(self.pos.unknown_money_2)
-        self.cp = self.df.u16_attr(self.pos.cp)
-        self.skills_spent = []
-        for label, pos in self.pos.skills:
-            self.skills_spent.append((label, self.df.u64_attr(pos)))
-        self.inv_item = Inventory('Item Inv', df, self.pos.inv_item, 20)
-        self.inv_weap = Inventory('Weapon Inv', df, self.pos.inv_weapon, 15)
-        self.inv_gear = Inventory('Gear Inv', df, self.pos.inv_gear, 15)
-        self.inv_val = Inventory('Valuables', df, self.pos.val, 25)
-        self.inv_box_item = Inventory('Item Box', df, self.pos.box_item, 200)
-        self.inv_box_weap = Inventory('Weapon Box', df, self.pos.box_weapon, 200)
-        self.inv_box_gear = Inventory('Gear Box', df, self.pos.box_gear, 200)
-        self.inv_special = Inventory(self.pos.special_label, df, self.pos.special, self.pos.special_qty)
+        self.layout = layout
+
+        # All our scalar values get decoded in one go -- see `y0.layout` for
+        # the details on what's what.
+        attrs = self.df.layout_attrs(self.layout)
+        self.money = attrs['money']
+        self.unknown_money_1 = attrs['unknown_money_1']
+        self.unknown_money_2 = attrs['unknown_money_2']
+        self.cp = attrs['cp']
+        self.skills_spent = list(zip(self.layout['skills_spent'].label, attrs['skills_spent']))
+
+        # Inventories: inv_item, inv_weap, inv_gear, inv_val, inv_box_item,
+        # inv_box_weap, inv_box_gear, and inv_special
+        for field in self.layout.blocks:
+            setattr(self, field.name, Inventory(field.label, df, field.offset, field.count))
 
     def clear_non_valuables(self, reg_inv=True, box=True):
         """
@@ -464,16 +704,130 @@ class Char:
             self.inv_box_gear.clear_all()
 
     def add_item_by_name(self, name, *args, **kwargs):
-        global items_by_name
-        name_lower = name.lower()
-        if name_lower in items_by_name:
-            self.add_item_by_id(items_by_name[name_lower].item_id, *args, **kwargs)
-        else:
-            print(' - ERROR: Item name "{}" not found, cannot insert'.format(name))
+        plan = ItemPlan(self)
+        plan.add_by_name(name, *args, **kwargs)
+        plan.apply()
 
     def add_item_by_id(self, item_id, qty=None, max_qty=False, to_box=False,
             force_idx=None, force_inv=None):
-        global items_by_id
+        plan = ItemPlan(self)
+        plan.add(item_id, qty=qty, max_qty=max_qty, to_box=to_box,
+                force_idx=force_idx, force_inv=force_inv)
+        plan.apply()
+
+    def plan_items(self, items, qty=None, max_qty=False, to_box=False):
+        """
+        Works out where each of the given items (which can be item IDs or
+        names) would go, without actually writing anything.  Returns an
+        `ItemPlan`.
+        """
+        plan = ItemPlan(self)
+        for item in items:
+            if isinstance(item, str):
+                plan.add_by_name(item, qty=qty, max_qty=max_qty, to_box=to_box)
+            else:
+                plan.add(item, qty=qty, max_qty=max_qty, to_box=to_box)
+        return plan
+
+    def add_items(self, items, qty=None, max_qty=False, to_box=False):
+        """
+        Adds a whole list of items (by ID or name) at once.  Everything gets
+        planned out first, then a summary of what does and doesn't fit is
+        printed, and finally each inventory gets a single write covering its
+        new items.  Returns the `ItemPlan`.
+        """
+        plan = self.plan_items(items, qty=qty, max_qty=max_qty, to_box=to_box)
+        plan.report()
+        plan.apply()
+        return plan
+
+class ItemPlacement:
+    """
+    A single item insertion which has been planned by `ItemPlan`
+    """
+
+    def __init__(self, inv, idx, item_id, item, qty, ammo, strikes):
+        self.inv = inv
+        self.idx = idx
+        self.item_id = item_id
+        self.item = item
+        self.qty = qty
+        self.ammo = ammo
+        self.strikes = strikes
+
+    def report(self):
+        if self.item:
+            report = '{} (ID {})'.format(self.item.name, self.item_id)
+        else:
+            report = 'ID {}'.format(self.item_id)
+        extras = []
+        # POCKET and CRAFT items use ammo/strike a bit differently, don't report on it then.
+        if not self.item or (self.item.item_type != ItemType.POCKET and self.item.item_type != ItemType.CRAFT):
+            if self.ammo == -1:
+                extras.append('ammo: ∞')
+            elif self.ammo > 0:
+                extras.append('ammo: {}'.format(self.ammo))
+            if self.strikes > 0:
+                extras.append('strikes: {}'.format(self.strikes/10))
+        if extras:
+            extra_str = ' ({})'.format(', '.join(extras))
+        else:
+            extra_str = ''
+        return f'{self.qty}x {report}{extra_str} in {self.inv.label} at idx {self.idx}'
+
+class ItemPlan:
+    """
+    A set of item insertions for a single Char, worked out in advance so that
+    we know what fits (and what doesn't) before anything gets written.  Slots
+    claimed by earlier items in the plan are taken into account when finding
+    free slots for later ones.  `apply()` then writes each inventory's new
+    items in a single chunk.
+    """
+
+    def __init__(self, char):
+        self.char = char
+        self.placements = []
+        self.failed = []
+        # Free-slot bitmaps as they'll look once the plan is applied, per inventory
+        self._free = {}
+
+    def _fail(self, item_id, message):
+        print(message)
+        self.failed.append((item_id, message))
+
+    def add_by_name(self, name, *args, **kwargs):
+        """
+        Plans the insertion of an item by name.  The name may include
+        qualifiers to pick between items which share a name (see
+        `y0.nameindex`).  Ambiguous or unknown names aren't inserted.
+        """
+        global reg
+        index = reg.name_index
+        matches = index.resolve(name)
+        if len(matches) == 1:
+            return self.add(matches[0].item_id, *args, **kwargs)
+        elif matches:
+            self._fail(name, ' - ERROR: Item name "{}" is ambiguous, cannot insert.  Could be: {}'.format(
+                name,
+                ', '.join('{} (ID {}, {})'.format(item.name, item.item_id, item.item_type.value)
+                    for item in matches),
+                ))
+            return None
+        else:
+            self._fail(name, ' - ERROR: Item name "{}" not found, cannot insert'.format(name))
+            suggestions = index.suggest(name)
+            if suggestions:
+                print('   Did you mean: {}'.format(', '.join(item.name for item in suggestions)))
+            return None
+
+    def add(self, item_id, qty=None, max_qty=False, to_box=False,
+            force_idx=None, force_inv=None):
+        """
+        Plans the insertion of the given item ID, returning the ItemPlacement
+        (or `None` if it can't be inserted).
+        """
+        global reg
+        char = self.char
         item = None
         inv = None
         new_qty = 1
@@ -481,23 +835,23 @@ class Char:
         strikes = 0
         hard_idx = None
         insert_idx = None
-        if item_id in items_by_id:
-            item = items_by_id[item_id]
+        if item_id in reg:
+            item = reg[item_id]
 
             # First doublecheck for a char_lock
-            if item.char_lock and item.char_lock != self.chartype:
-                print(' - ERROR: Refusing to add {} to {}'.format(
+            if item.char_lock and item.char_lock != char.chartype:
+                self._fail(item_id, ' - ERROR: Refusing to add {} to {}'.format(
                     item.name,
-                    self.name,
+                    char.name,
                     ))
-                return
+                return None
 
             # If we made it here, we should be good so long as we don't run out of room.
             if item.item_type == ItemType.WEP:
                 if to_box:
-                    inv = self.inv_box_weap
+                    inv = char.inv_box_weap
                 else:
-                    inv = self.inv_weap
+                    inv = char.inv_weap
                 if item.ammo is None:
                     # Ammo does not apply to this gun
                     ammo = -2
@@ -514,14 +868,14 @@ class Char:
                     strikes = item.strikes*10
             elif item.item_type == ItemType.GEAR:
                 if to_box:
-                    inv = self.inv_box_gear
+                    inv = char.inv_box_gear
                 else:
-                    inv = self.inv_gear
+                    inv = char.inv_gear
             elif item.item_type == ItemType.VAL or item.item_type == ItemType.VALJUNK:
-                inv = self.inv_val
+                inv = char.inv_val
                 hard_idx = item.hard_idx
             elif item.item_type == ItemType.POCKET or item.item_type == ItemType.CRAFT:
-                inv = self.inv_special
+                inv = char.inv_special
                 hard_idx = item.hard_idx
                 # "strikes" seems to be used to decide if the item is visible in the menu,
                 # and "ammo" seems to be used as an indicator that the item has been seen
@@ -538,13 +892,13 @@ class Char:
                 if to_box:
                     # TODO: Item Box only allows a single entry per item type, so technically
                     # we'd need to check for that.
-                    inv = self.inv_box_item
+                    inv = char.inv_box_item
                     if qty is not None:
                         new_qty = max(1, min(qty, item.max_in_box))
                     if max_qty:
                         new_qty = item.max_in_box
                 else:
-                    inv = self.inv_item
+                    inv = char.inv_item
                     if qty is not None:
                         new_qty = max(1, min(qty, item.max_in_inv))
                     if max_qty:
@@ -558,52 +912,62 @@ class Char:
         # one (and show a warning!)
         if not inv:
             print(' - WARNING: Item ID {} not found, inserting into regular inventory...'.format(item_id))
-            inv = self.inv_item
+            inv = char.inv_item
 
         # Figure out what index in the inventory to store.  If we've been told to force
         # a specific one, use that.  Otherwise, if the itemtype wants a hard index
         # number, use that.  Otherwise, find an open slot
+        if inv not in self._free:
+            self._free[inv] = inv.free_mask
+        free = self._free[inv]
         if force_idx is not None:
             insert_idx = force_idx
         elif hard_idx is not None:
             insert_idx = hard_idx
+        elif free:
+            insert_idx = (free & -free).bit_length()-1
         else:
-            for idx, inv_item in enumerate(inv.items):
-                if not inv_item.has_data:
-                    insert_idx = idx
-                    break
-            if insert_idx is None:
-                print(' - ERROR: Item ID {} could not be inserted into {} due to lack of space'.format(
-                    item_id,
-                    inv.label,
-                    ))
-                return
+            self._fail(item_id, ' - ERROR: Item ID {} could not be inserted into {} due to lack of space'.format(
+                item_id,
+                inv.label,
+                ))
+            return None
 
         # Test to see if our index is valid
-        if item:
-            report = '{} (ID {})'.format(item.name, item_id)
-        else:
-            report = 'ID {}'.format(item_id)
-        if insert_idx >= len(inv.items):
-            print(f' - ERROR: Cannot insert "{report}" at {inv.label} index {insert_idx} -- the inventory is not that large')
-            return
-        else:
-            # Finally, do the insert
-            extras = []
-            # POCKET and CRAFT items use ammo/strike a bit differently, don't report on it then.
-            if not item or (item.item_type != ItemType.POCKET and item.item_type != ItemType.CRAFT):
-                if ammo == -1:
-                    extras.append('ammo: ∞')
-                elif ammo > 0:
-                    extras.append('ammo: {}'.format(ammo))
-                if strikes > 0:
-                    extras.append('strikes: {}'.format(strikes/10))
-            if extras:
-                extra_str = ' ({})'.format(', '.join(extras))
+        placement = ItemPlacement(inv, insert_idx, item_id, item, new_qty, ammo, strikes)
+        if not 0 <= insert_idx < inv.count:
+            if item:
+                report = '{} (ID {})'.format(item.name, item_id)
             else:
-                extra_str = ''
-            print(f' - Saving {new_qty}x {report}{extra_str} in {inv.label} at idx {insert_idx}')
-            inv.overwrite_item_at(insert_idx, item_id, item, new_qty, ammo, strikes)
+                report = 'ID {}'.format(item_id)
+            if insert_idx < 0:
+                self._fail(item_id, f' - ERROR: Cannot insert "{report}" at {inv.label} index {insert_idx} -- the index cannot be negative')
+            else:
+                self._fail(item_id, f' - ERROR: Cannot insert "{report}" at {inv.label} index {insert_idx} -- the inventory is not that large')
+            return None
+
+        print(f' - Saving {placement.report()}')
+        self._free[inv] = free & ~(1 << insert_idx)
+        self.placements.append(placement)
+        return placement
+
+    def report(self):
+        print(' - {} item(s) will be saved, {} could not be added'.format(
+            len(self.placements),
+            len(self.failed),
+            ))
+
+    def apply(self):
+        """
+        Writes out all our planned items, with a single write per inventory.
+        """
+        updates = {}
+        for placement in self.placements:
+            inv_updates = updates.setdefault(placement.inv, {})
+            inv_updates[placement.idx] = (placement.item_id, placement.item,
+                    placement.qty, placement.ammo, placement.strikes)
+        for inv, inv_updates in updates.items():
+            inv.write_items(inv_updates)
 
 class HostessRoster:
     
@@ -626,50 +990,133 @@ class HostessRoster:
             hostess = hostesses_by_id[hostess_id]
             if level is not None:
                 level = str(min(level, hostess.max_level))
-                xp = self.df.u32_attr(hostess.xp_pos)
                 if fast == False or (fast == True and level == "1"):
-                    xp.val = xp_levels[level]
+                    self.df.write_field(HOSTESSES['xp'], xp_levels[level], hostess_id-1)
                     print(f'Setting hostess {hostess.name} to level {level}.')
                 else:
-                    xp.val = xp_levels[level] - 1
+                    self.df.write_field(HOSTESSES['xp'], xp_levels[level] - 1, hostess_id-1)
                     print(f'Setting hostess {hostess.name} to level {int(level)-1} with 1XP remaining to level up.')
                     
             if sales is not None:
-                yen = self.df.u32_attr(hostess.sales_pos)
-                yen.val = sales
+                self.df.write_field(HOSTESSES['sales'], sales, hostess_id-1)
                 print(f'Setting hostess {hostess.name} sales to {sales} yen.')
 
 class NotASavegameException(Exception):
     pass
 
-class Savegame:
+class SaveInfo:
+    """
+    The general info from the top of a savefile, shared by `Savegame` and
+    `SaveHeader`.  See `y0.layout.HEADER` for some notes on these.
+    """
 
     save_re = re.compile(r'^(.*/)?SaveData(?P<slot>\d+)\.(?P<save_type>(sav|clr))$')
 
-    def __init__(self, filename):
+    def set_header_info(self, cur_char, chapter, saved, played):
+        self.cur_char = cur_char
+        self.chapter = chapter+1
+
+        # Date/Time the save was, y'know, saved at.
+        (self.saved_year, self.saved_month, self.saved_day_of_week, self.saved_day,
+                self.saved_hours, self.saved_mins, self.saved_secs) = saved
+        self.saved_txt = '{:04d}-{:02d}-{:02d} {:02d}:{:02d}:{:02d}'.format(
+                self.saved_year, self.saved_month, self.saved_day,
+                self.saved_hours, self.saved_mins, self.saved_secs,
+                )
+
+        # Time played (stored in thirds of milliseconds, see `read_millis_as_seconds`)
+        self.secs_played = played/3/1000
+        mins_played = self.secs_played/60
+        hours_played, mins_played = (int(v) for v in divmod(mins_played, 60))
+        self.played_txt = '{}:{:02d}'.format(hours_played, mins_played)
+
+    @staticmethod
+    def describe_filename(filename):
+        """
+        Works out the slot (or clear data) number from a savegame's filename,
+        if we can.  Returns a `(slot_num, clear_num, filename_str)` tuple.
+        Doesn't touch the file itself.
+        """
+        slot_num = None
+        clear_num = None
+        if match := SaveInfo.save_re.match(filename):
+            if match.group('save_type') == 'sav':
+                slot_num = int(match.group('slot'))+1
+            else:
+                clear_num = int(match.group('slot'))+1
+        if slot_num is not None:
+            filename_str = '{} (Slot {})'.format(filename, slot_num)
+        elif clear_num is not None:
+            filename_str = '{} (Clear Data {})'.format(filename, clear_num)
+        else:
+            filename_str = filename
+        return slot_num, clear_num, filename_str
+
+class SaveHeader(SaveInfo):
+    """
+    Just the general info from the top of a savefile, for things like slot
+    pickers which don't need anything else.  Only the first `HEADER.end`
+    bytes of the file get read in.  Touching anything which isn't in the
+    header (`kiryu`, `hostess_roster`, `overwrite()`, etc) loads the whole
+    Savegame, using the args passed in here, and hands off to that.
+    """
+
+    def __init__(self, filename, **kwargs):
+        self.filename = filename
+        self.filename_short = os.path.basename(filename)
+        self.load_args = kwargs
+        fd = os.open(filename, os.O_RDONLY)
+        try:
+            data = os.pread(fd, HEADER.end, 0)
+        finally:
+            os.close(fd)
+        if data[:4] != b'YZFH' or len(data) < HEADER.end:
+            raise NotASavegameException()
+        self.slot_num, self.clear_num, self.filename_str = SaveInfo.describe_filename(filename)
+        header = HEADER.decode(data)
+        self.set_header_info(header['cur_char'], header['chapter'],
+                header['saved'], header['played'])
+        self.difficulty = header['difficulty1']
+
+    @functools.cached_property
+    def savegame(self):
+        return Savegame(self.filename, **self.load_args)
+
+    @property
+    def loaded(self):
+        return 'savegame' in self.__dict__
+
+    def __getattr__(self, name):
+        # Only called for attributes we don't have ourselves
+        if name.startswith('__') or name in ('savegame', 'load_args'):
+            raise AttributeError(name)
+        return getattr(self.savegame, name)
+
+    def close(self):
+        if self.loaded:
+            self.savegame.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exit_type, value, traceback):
+        self.close()
+
+class Savegame(SaveInfo):
+
+    def __init__(self, filename, use_mmap=False, readonly=False):
         self.filename = filename
         self.filename_short = os.path.basename(filename)
-        self.df = Datafile(self.filename)
+        self.df = Datafile(self.filename, use_mmap=use_mmap, readonly=readonly)
 
-        # Check the magic
+        # Check the magic, and make sure there's at least a full header
         magic = self.df.read(4)
-        if magic != b'YZFH':
+        if magic != b'YZFH' or len(self.df) < HEADER.end:
+            self.df.close()
             raise NotASavegameException()
 
         # Check to see if we know what slot number this is
-        self.slot_num = None
-        self.clear_num = None
-        if match := self.save_re.match(filename):
-            if match.group('save_type') == 'sav':
-                self.slot_num = int(match.group('slot'))+1
-            else:
-                self.clear_num = int(match.group('slot'))+1
-        if self.slot_num is not None:
-            self.filename_str = '{} (Slot {})'.format(self.filename, self.slot_num)
-        elif self.clear_num is not None:
-            self.filename_str = '{} (Clear Data {})'.format(self.filename, self.clear_num)
-        else:
-            self.filename_str = self.filename
+        self.slot_num, self.clear_num, self.filename_str = SaveInfo.describe_filename(filename)
 
         # Now start readin'
 
@@ -694,27 +1141,11 @@ class Savegame:
         #    7) A single byte at 0x1AA39 seems to vaccilate between various rather
         #       low numbers (I don't think I've seen higher than like 4 or 5).
 
-        # I'd be surprised if this is what actually *controlled* who the active
-        # character is, but it's at least a convenient string to display.
-        self.cur_char = self.df.read_str(0x8)
-
-        # Likewise, I wouldn't be surprised if this bit was just there for the
-        # "load" dialog to show info to the user.
-        self.chapter = self.df.read_u8(0x6)+1
-
-        # Date/Time the save was, y'know, saved at.
-        (self.saved_year, self.saved_month, self.saved_day_of_week, self.saved_day,
-                self.saved_hours, self.saved_mins, self.saved_secs) = self.df.read_datetime(0x28)
-        self.saved_txt = '{:04d}-{:02d}-{:02d} {:02d}:{:02d}:{:02d}'.format(
-                self.saved_year, self.saved_month, self.saved_day,
-                self.saved_hours, self.saved_mins, self.saved_secs,
-                )
-
-        # Time played
-        self.secs_played = self.df.read_millis_as_seconds(0x00448)
-        mins_played = self.secs_played/60
-        hours_played, mins_played = (int(v) for v in divmod(mins_played, 60))
-        self.played_txt = '{}:{:02d}'.format(hours_played, mins_played)
+        # The general info at the top of the file.  See `y0.layout` for some
+        # notes on these.
+        header = self.df.layout_attrs(HEADER)
+        self.set_header_info(header['cur_char'], header['chapter'].val,
+                [v.val for v in header['saved']], header['played'].val)
 
         # There's some kind of counter at 0x11178 which starts at 30min and goes
         # down to zero before looping back, also in thirds-of-milliseconds.  I
@@ -722,60 +1153,107 @@ class Savegame:
         # or something, but why not just use the time-played stat for that?
 
         # Difficulty
-        self.difficulty1 = self.df.u8_attr(0x444)
-        self.difficulty2 = self.df.u8_attr(0x445)
+        self.difficulty1 = header['difficulty1']
+        self.difficulty2 = header['difficulty2']
         assert(self.difficulty1.val == self.difficulty2.val)
 
-        # Characters
-        self.kiryu = Char(self.df, PC.Kiryu, CharPositions(
-            money=0xF2C0,
-            unknown_money_1=0xF2D0,
-            unknown_money_2=0xF2E0,
-            cp=0xF3E0,
-            skill_1=('Brawler', 0x72F0),
-            skill_2=('Rush', 0x72F8),
-            skill_3=('Beast', 0x7300),
-            skill_4=('Dragon', 0x7308),
-            inv_item=0x07AAC,
-            inv_weapon=0x0CE6C,
-            inv_gear=0x0D04C,
-            box_item=0x0836C,
-            box_weapon=0x09C6C,
-            box_gear=0x0B56C,
-            val=0x07D3C,
-            special_label='Pocket Circuit',
-            special=0xD86C,
-            special_qty=113,
-            ))
-        self.majima = Char(self.df, PC.Majima, CharPositions(
-            money=0xF2C8,
-            unknown_money_1=0xF2D8,
-            unknown_money_2=0xF2E8,
-            cp=0xF3E8,
-            # This isn't the order in which they're shown on the screen, btw!
-            skill_1=('Thug', 0x76F0),
-            skill_2=('Breaker', 0x76F8),
-            skill_3=('Slugger', 0x7700),
-            skill_4=('Mad Dog', 0x7708),
-            inv_item=0x7BEC,
-            inv_weapon=0xCF5C,
-            inv_gear=0xD13C,
-            box_item=0x8FEC,
-            box_weapon=0xA8EC,
-            box_gear=0xC1EC,
-            val=0x805C,
-            special_label='Crafting',
-            special=0xD22C,
-            special_qty=96,
-            ))
-        self.chars = [self.kiryu, self.majima]
+        # Characters get built the first time they're asked for, via `kiryu`,
+        # `majima`, `chars`, or `select_chars()`.
         
         # Hostesses
         self.hostess_roster = HostessRoster(self.df)
 
+    @property
+    def difficulty(self):
+        return self.difficulty1.val
+
+    @functools.cached_property
+    def kiryu(self):
+        return Char(self.df, PC.Kiryu, KIRYU)
+
+    @functools.cached_property
+    def majima(self):
+        return Char(self.df, PC.Majima, MAJIMA)
+
+    @property
+    def chars(self):
+        return [self.kiryu, self.majima]
+
+    def select_chars(self, pc):
+        """
+        Returns the list of Chars referred to by the given `PC` value (which
+        may be `PC.Current` or `PC.Both`), only building the ones we need.
+        """
+        if pc == PC.Both:
+            return self.chars
+        elif pc == PC.Current:
+            if self.cur_char == PC.Kiryu.value:
+                return [self.kiryu]
+            elif self.cur_char == PC.Majima.value:
+                return [self.majima]
+            else:
+                return []
+        elif pc == PC.Kiryu:
+            return [self.kiryu]
+        elif pc == PC.Majima:
+            return [self.majima]
+        else:
+            return []
+
+    @property
+    def size(self):
+        return len(self.df)
+
+    def sha1(self):
+        return self.df.sha1()
+
+    def start_recording(self):
+        self.df.start_recording()
+
+    def stop_recording(self):
+        return self.df.stop_recording()
+
     def write_to(self, *args, **kwargs):
         self.df.write_to(*args, **kwargs)
 
     def overwrite(self, *args, **kwargs):
         self.df.overwrite(*args, **kwargs)
 
+    @classmethod
+    def open(cls, filename, header_only=False, **kwargs):
+        """
+        Opens a savefile.  With `header_only`, a `SaveHeader` is returned
+        instead, which only reads in the rest of the file if something other
+        than the header info is asked for.  Any extra args are passed along to
+        the constructor (and saved for later, for a `SaveHeader`).
+        """
+        if header_only:
+            return SaveHeader(filename, **kwargs)
+        return cls(filename, **kwargs)
+
+    # asyncio counterparts to the above.  The actual work happens in an
+    # executor, subject to the limit set by `y0.aio.set_concurrency()`.
+
+    @classmethod
+    async def aload(cls, filename, executor=None, **kwargs):
+        """
+        Loads a Savegame without blocking the event loop.  Any extra args are
+        passed along to the constructor.
+        """
+        return await aio.run_io(cls, filename, executor=executor, **kwargs)
+
+    async def awrite_to(self, filename, executor=None):
+        await aio.run_io(self.write_to, filename, executor=executor)
+
+    async def aoverwrite(self, executor=None):
+        await aio.run_io(self.overwrite, executor=executor)
+
+    def close(self):
+        self.df.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exit_type, value, traceback):
+        self.close()
+
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# vim: set expandtab tabstop=4 shiftwidth=4:
+
+# Copyright 2021 Christopher J. Kucera
+# <cj@apocalyptech.com>
+# <http://apocalyptech.com/contact.php>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the development team nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL CJ KUCERA BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import os
+from y0.savegame import Savegame
+
+# Finds savegames in a directory tree (such as a Steam `userdata` dir), with
+# as little I/O as possible: candidates are picked out by filename, and then
+# confirmed by reading just their first four bytes.  Each savegame is paired
+# up with the `remotecache.vdf` which describes it (which lives in the parent
+# of the savegame's directory), checking for that once per directory.
+
+MAGIC = b'YZFH'
+
+def has_magic(path):
+    """
+    Returns `True` if the given file starts with the savegame magic bytes
+    """
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return False
+    try:
+        return os.read(fd, len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+    finally:
+        os.close(fd)
+
+class ScanResult:
+    """
+    A savegame found by `scan()`, along with the path to its remotecache.vdf
+    (or `None`, if there isn't one)
+    """
+
+    def __init__(self, filename, remotecache):
+        self.filename = filename
+        self.remotecache = remotecache
+
+    def __repr__(self):
+        return 'ScanResult<{},{}>'.format(self.filename, self.remotecache)
+
+def scan(top, follow_symlinks=False):
+    """
+    Walks the directory tree under `top`, yielding a `ScanResult` for each
+    savegame found.  Directories are processed in sorted order, so the
+    results are consistent from run to run.
+    """
+    stack = [top]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                entries = sorted(entries, key=lambda entry: entry.name)
+        except OSError:
+            continue
+        subdirs = []
+        remotecache = None
+        checked_remotecache = False
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=follow_symlinks):
+                    subdirs.append(entry.path)
+                    continue
+                if not entry.is_file():
+                    continue
+            except OSError:
+                continue
+            if not Savegame.save_re.match(entry.name) or not has_magic(entry.path):
+                continue
+            if not checked_remotecache:
+                candidate = os.path.join(os.path.dirname(os.path.abspath(directory)), 'remotecache.vdf')
+                if os.path.isfile(candidate):
+                    remotecache = candidate
+                checked_remotecache = True
+            yield ScanResult(entry.path, remotecache)
+        # Reversed, so that popping off the stack goes in sorted order
+        stack.extend(reversed(subdirs))
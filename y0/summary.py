@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+# vim: set expandtab tabstop=4 shiftwidth=4:
+
+# Copyright 2021 Christopher J. Kucera
+# <cj@apocalyptech.com>
+# <http://apocalyptech.com/contact.php>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the development team nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL CJ KUCERA BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import os
+import json
+import tempfile
+from y0 import PC
+from y0.savegame import Savegame, SaveItem, Inventory
+
+# Plain-data summaries of a savegame -- basically everything `y0save.py --info`
+# shows.  These can be stashed in a `SummaryCache` so that repeated listings
+# of unchanged saves don't have to load and parse them all over again.
+
+difficulty = {
+        0: 'Easy',
+        1: 'Normal',
+        2: 'Hard',
+        3: 'Legendary',
+        }
+
+# Inventories in the order they get reported.  The Item Box ones are only
+# shown in verbose mode.
+report_invs = ['inv_item', 'inv_weap', 'inv_gear', 'inv_val', 'inv_special']
+report_box_invs = ['inv_box_item', 'inv_box_weap', 'inv_box_gear']
+
+def summarize(save, chars=None, boxes=True):
+    """
+    Returns a JSON-friendly dict describing the given Savegame.  By default
+    both chars are included (with their Item Box contents); pass in a list
+    of `chars` and/or `boxes=False` to only decode what you need.  Only the
+    occupied inventory slots are listed, each as the raw record values
+    `[idx, item_id, qty, strikes, ammo, unknown]`.
+    """
+    if chars is None:
+        chars = save.chars
+    inv_names = list(report_invs)
+    if boxes:
+        inv_names.extend(report_box_invs)
+    summary = summarize_header(save)
+    summary['chars'] = {}
+    for char in chars:
+        invs = {}
+        for inv_name in inv_names:
+            inv = getattr(char, inv_name)
+            invs[inv_name] = {
+                    'label': inv.label,
+                    'count': inv.count,
+                    'items': [[idx, item.item_id, item.qty, item.strikes, item.ammo, item.unknown]
+                        for idx, item in enumerate(inv.items) if item.has_data],
+                    }
+        summary['chars'][char.name] = {
+                'money': char.money.val,
+                'unknown_money_1': char.unknown_money_1.val,
+                'unknown_money_2': char.unknown_money_2.val,
+                'cp': char.cp.val,
+                'skills_spent': [[label, skill_spent.val] for label, skill_spent in char.skills_spent],
+                'inventories': invs,
+                }
+    return summary
+
+def summarize_header(save):
+    """
+    Returns just the general info from the top of the savefile, as a dict.
+    `save` can be a `Savegame` or a `SaveHeader`.
+    """
+    return {
+            'cur_char': save.cur_char,
+            'chapter': save.chapter,
+            'saved_txt': save.saved_txt,
+            'secs_played': save.secs_played,
+            'played_txt': save.played_txt,
+            'difficulty': save.difficulty,
+            }
+
+def make_record(filename, summary):
+    """
+    Returns a self-contained record for the given savefile and its summary,
+    as used by `--format ndjson`
+    """
+    slot_num, clear_num = Savegame.describe_filename(filename)[:2]
+    record = {
+            'filename': filename,
+            'slot': slot_num,
+            'clear_data': clear_num,
+            'difficulty_name': difficulty.get(summary['difficulty']),
+            }
+    record.update(summary)
+    return record
+
+def write_record(df, record):
+    """
+    Writes a record out as a single line of JSON
+    """
+    df.write(json.dumps(record, separators=(',', ':')))
+    df.write('\n')
+
+def select_chars(summary, pc):
+    """
+    The summary equivalent of `Savegame.select_chars()`: returns the names
+    of the chars referred to by the given `PC` value.
+    """
+    if pc == PC.Both:
+        names = [PC.Kiryu.value, PC.Majima.value]
+    elif pc == PC.Current:
+        names = [summary['cur_char']]
+    else:
+        names = [pc.value]
+    return [name for name in names if name in summary['chars']]
+
+def report(summary, pc=PC.Current, verbose=False):
+    """
+    Prints out the `--info` report for a summary
+    """
+
+    print('General')
+    print('-------')
+    print('Current Char: {}'.format(summary['cur_char']))
+    print('Chapter: {}'.format(summary['chapter']))
+    print('Saved on: {}'.format(summary['saved_txt']))
+    print('Time Played: {}'.format(summary['played_txt']))
+    print('Difficulty: {}'.format(difficulty[summary['difficulty']]))
+    print('')
+
+    # Now report on character data
+    for name in select_chars(summary, pc):
+        char = summary['chars'][name]
+
+        print(name)
+        print('-'*len(name))
+
+        print('Money: {:,}'.format(char['money']))
+        #print('Unknown Money 1: {:,}'.format(char['unknown_money_1']))
+        #print('Unknown Money 2: {:,}'.format(char['unknown_money_2']))
+        print('CP: {}'.format(char['cp']))
+        if verbose:
+            # These aren't especially interesting, really, but here they are anyway.
+            for label, skill_spent in char['skills_spent']:
+                print('Spent on {} Style: {:,}'.format(label, skill_spent))
+        print('')
+
+        # Inventories
+        inv_names = list(report_invs)
+        if verbose:
+            inv_names.extend(report_box_invs)
+        for inv_name in inv_names:
+            inv = char['inventories'][inv_name]
+            Inventory.report_items(inv['label'],
+                    ((idx, SaveItem(item_id, qty, strikes, ammo, unknown))
+                        for idx, item_id, qty, strikes, ammo, unknown in inv['items']))
+
+class SummaryCache:
+    """
+    An on-disk cache of savegame summaries, stored as JSON.  Entries are
+    keyed on the file's absolute path, and are only considered valid so long
+    as the file's size, mtime (in ns), and inode number all still match, so
+    checking a file against the cache only costs a `stat`.
+    """
+
+    version = 1
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.entries = {}
+        self.modified = False
+        try:
+            with open(filename) as df:
+                data = json.load(df)
+            if data.get('version') == self.version:
+                self.entries = data['files']
+        except FileNotFoundError:
+            pass
+        except (ValueError, KeyError, AttributeError):
+            # Corrupt or otherwise unusable; we'll just start fresh
+            self.modified = True
+
+    @staticmethod
+    def stat_key(filename):
+        """
+        Returns the `[size, mtime_ns, inode]` which a cached entry for the
+        given file has to match.  If you're going to `put()` a summary, grab
+        this *before* reading the file, so that changes made in the meantime
+        will invalidate the entry.
+        """
+        statinfo = os.stat(filename)
+        return [statinfo.st_size, statinfo.st_mtime_ns, statinfo.st_ino]
+
+    def get(self, filename):
+        """
+        Returns the cached summary for the given file, or `None` if we don't
+        have one (or it's out of date)
+        """
+        entry = self.entries.get(os.path.abspath(filename))
+        if entry is None:
+            return None
+        try:
+            if entry['stat'] != SummaryCache.stat_key(filename):
+                return None
+        except OSError:
+            return None
+        return entry['summary']
+
+    def put(self, filename, stat_key, summary):
+        self.entries[os.path.abspath(filename)] = {
+                'stat': stat_key,
+                'summary': summary,
+                }
+        self.modified = True
+
+    def save(self):
+        """
+        Writes the cache out, if anything's changed.  The new data gets
+        written to a temp file first, which then replaces the old one, so
+        an interrupted write can't leave a corrupt cache behind.
+        """
+        if not self.modified:
+            return
+        cache_dir = os.path.dirname(os.path.abspath(self.filename))
+        fd, temp_filename = tempfile.mkstemp(dir=cache_dir, prefix='.y0summary-')
+        try:
+            with os.fdopen(fd, 'w') as df:
+                json.dump({'version': self.version, 'files': self.entries}, df)
+            os.replace(temp_filename, self.filename)
+        except BaseException:
+            os.unlink(temp_filename)
+            raise
+        self.modified = False
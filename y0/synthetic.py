@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# vim: set expandtab tabstop=4 shiftwidth=4:
+
+# Copyright 2021 Christopher J. Kucera
+# <cj@apocalyptech.com>
+# <http://apocalyptech.com/contact.php>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the development team nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL CJ KUCERA BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import os
+import random
+from y0 import PC
+from y0.layout import get_codec, HEADER, KIRYU, MAJIMA, HOSTESSES
+from y0.itemregistry import ItemType, reg
+
+# Generates synthetic savegames (and remotecache.vdf files to go with them),
+# for benchmarking and the like.  These only fill in the bits of the file we
+# actually know about, so the game itself would probably be pretty unhappy
+# with them, but they're perfectly valid as far as this editor's concerned.
+
+# Size of a savefile
+SAVE_SIZE = 0x2A000
+
+# Steam app ID for Yakuza 0
+GAME_ID = 638970
+
+# Which item types get randomly inserted into which inventories
+inv_types = {
+        'inv_item': [ItemType.ITEM],
+        'inv_weap': [ItemType.WEP],
+        'inv_gear': [ItemType.GEAR],
+        'inv_box_item': [ItemType.ITEM, ItemType.MENU, ItemType.JUNK],
+        'inv_box_weap': [ItemType.WEP],
+        'inv_box_gear': [ItemType.GEAR],
+        }
+
+def item_record(item, qty=1):
+    """
+    Returns the `(item_id, strikes, ammo, qty, unknown)` record values for
+    the given ItemDesc, set up the same way `ItemPlan` would set them.
+    """
+    strikes = 0
+    ammo = 0
+    if item.item_type == ItemType.WEP:
+        if item.ammo is None:
+            ammo = -2
+        elif item.ammo == 0:
+            ammo = -1
+        else:
+            ammo = item.ammo
+        if item.strikes is None or item.strikes == 0:
+            strikes = -1
+        else:
+            strikes = item.strikes*10
+    elif item.item_type == ItemType.POCKET or item.item_type == ItemType.CRAFT:
+        strikes = 1
+        ammo = 1
+    return (item.item_id, strikes, ammo, qty, 0)
+
+def _fill_char(buf, rng, layout, special_type, fill, box_fill):
+    layout.pack_into(buf, {
+        'money': rng.randrange(10000000000),
+        'unknown_money_1': rng.randrange(10000000000),
+        'unknown_money_2': rng.randrange(10000000000),
+        'cp': rng.randrange(1000),
+        'skills_spent': [rng.randrange(100000000) for _ in range(4)],
+        })
+
+    codec = get_codec(layout['inv_item'].vartype)
+    for field in layout.blocks:
+        if field.name in inv_types:
+            candidates = reg.of_type(*inv_types[field.name])
+            ratio = box_fill if field.name.startswith('inv_box_') else fill
+            for pos in field.positions:
+                if rng.random() < ratio:
+                    item = rng.choice(candidates)
+                    if field.name == 'inv_box_item':
+                        qty = rng.randint(1, item.max_in_box)
+                    else:
+                        qty = rng.randint(1, item.max_in_inv)
+                    codec.pack_into(buf, pos, *item_record(item, qty))
+        else:
+            # Valuables and the special inventories have fixed slots per item
+            if field.name == 'inv_val':
+                item_types = [ItemType.VAL]
+            else:
+                item_types = [special_type]
+            for item in reg.of_type(*item_types):
+                if item.hard_idx is not None and item.hard_idx < field.count and rng.random() < fill:
+                    qty = rng.randint(1, item.max_in_inv)
+                    codec.pack_into(buf, field.position(item.hard_idx), *item_record(item, qty))
+
+def make_save(seed=None, cur_char=None, fill=0.5, box_fill=0.5):
+    """
+    Returns the data for a random savegame, as a bytearray.  `fill` and
+    `box_fill` are the chance of any given inventory/Item Box slot being
+    filled (so pass `box_fill=1` to get full Item Boxes).  If `cur_char` isn't
+    given, one is picked at random.
+    """
+    rng = random.Random(seed)
+    buf = bytearray(SAVE_SIZE)
+    buf[0:4] = b'YZFH'
+
+    if cur_char is None:
+        cur_char = rng.choice([PC.Kiryu, PC.Majima])
+    header = {
+        'chapter': rng.randrange(17),
+        'cur_char': cur_char.value,
+        'saved': [
+            rng.randint(2018, 2024),
+            rng.randint(1, 12),
+            rng.randrange(7),
+            rng.randint(1, 28),
+            rng.randrange(24),
+            rng.randrange(60),
+            rng.randrange(60),
+            ],
+        }
+    difficulty = rng.randrange(4)
+    header['difficulty1'] = difficulty
+    header['difficulty2'] = difficulty
+    header['played'] = rng.randrange(3*1000*3600*200)
+    HEADER.pack_into(buf, header)
+
+    _fill_char(buf, rng, KIRYU, ItemType.POCKET, fill, box_fill)
+    _fill_char(buf, rng, MAJIMA, ItemType.CRAFT, fill, box_fill)
+
+    HOSTESSES.pack_into(buf, {
+        'xp': [rng.randrange(100000) for _ in range(HOSTESSES['xp'].count)],
+        'sales': [rng.randrange(100000000) for _ in range(HOSTESSES['sales'].count)],
+        })
+
+    return buf
+
+def write_save(filename, **kwargs):
+    """
+    Writes out a random savegame (see `make_save()` for the arguments)
+    """
+    with open(filename, 'wb') as df:
+        df.write(make_save(**kwargs))
+
+def make_remotecache(filenames, game_id=GAME_ID, change_num=1):
+    """
+    Returns the text of a remotecache.vdf describing the given files (which
+    should all live in the same `remote` directory).  Sizes and timestamps
+    are taken from the files; the hashes are placeholders, which a sync will
+    fill in properly.
+    """
+    lines = ['"{}"'.format(game_id), '{', '\t"ChangeNumber"\t\t"{}"'.format(change_num)]
+    for filename in filenames:
+        statinfo = os.stat(filename)
+        mtime = int(statinfo.st_mtime)
+        lines.append('\t"{}"'.format(os.path.basename(filename)))
+        lines.append('\t{')
+        for key, value in [
+                ('root', 0),
+                ('size', statinfo.st_size),
+                ('localtime', mtime),
+                ('time', mtime),
+                ('remotetime', mtime),
+                ('sha', '0'*40),
+                ('syncstate', 1),
+                ('persiststate', 0),
+                ('platformstosync2', -1),
+                ]:
+            lines.append('\t\t"{}"\t\t"{}"'.format(key, value))
+        lines.append('\t}')
+    lines.append('}')
+    return '\n'.join(lines) + '\n'
+
+def write_library(directory, count, seed=None, **kwargs):
+    """
+    Writes `count` random savegames into `directory/remote`, along with a
+    `directory/remotecache.vdf` for them, laid out the same way Steam does.
+    Any extra args are passed to `make_save()`.  Returns the list of savefile
+    names, and the remotecache.vdf filename.
+    """
+    rng = random.Random(seed)
+    remote_dir = os.path.join(directory, 'remote')
+    os.makedirs(remote_dir, exist_ok=True)
+    filenames = []
+    for idx in range(count):
+        filename = os.path.join(remote_dir, 'SaveData{:04d}.sav'.format(idx))
+        write_save(filename, seed=rng.randrange(2**32), **kwargs)
+        filenames.append(filename)
+    cache_filename = os.path.join(directory, 'remotecache.vdf')
+    with open(cache_filename, 'w') as df:
+        df.write(make_remotecache(filenames))
+    return filenames, cache_filename
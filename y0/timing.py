@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# vim: set expandtab tabstop=4 shiftwidth=4:
+
+# Copyright 2021 Christopher J. Kucera
+# <cj@apocalyptech.com>
+# <http://apocalyptech.com/contact.php>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the development team nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL CJ KUCERA BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import sys
+import time
+import contextlib
+
+# Lightweight per-phase timing, for figuring out where the time goes when
+# processing a bunch of savefiles.  Code which wants to be timed wraps its
+# phases in `with timing.phase('name'):`, which does nothing at all unless a
+# `PhaseTimer` has been activated with `set_timer()` (or `timed()`).  Each
+# pass through a phase is recorded separately, so when a phase happens once
+# per file we get per-file numbers to build percentiles from.
+#
+# Phases can be nested, in which case the outer phase's time includes the
+# inner one's.
+
+class PhaseTimer:
+    """
+    Collects wall-clock and CPU times for named phases
+    """
+
+    percentiles = (50, 90, 99)
+
+    def __init__(self):
+        # Phase name -> list of (wall, cpu) tuples, in seconds
+        self.records = {}
+
+    def record(self, name, wall, cpu):
+        self.records.setdefault(name, []).append((wall, cpu))
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            self.record(name,
+                    time.perf_counter() - wall_start,
+                    time.process_time() - cpu_start)
+
+    def merge(self, records):
+        """
+        Adds in the records from another timer (as found in its `records`
+        attribute), such as one which was running in a worker process.
+        """
+        for name, times in records.items():
+            self.records.setdefault(name, []).extend(times)
+
+    @staticmethod
+    def percentile(values, pct):
+        """
+        Nearest-rank percentile of an already-sorted list
+        """
+        idx = max(0, min(len(values)-1, -(-len(values)*pct//100)-1))
+        return values[idx]
+
+    def summary(self):
+        """
+        Returns a dict of aggregated stats for each phase, in the order the
+        phases were first seen
+        """
+        stats = {}
+        for name, times in self.records.items():
+            phase_stats = {'count': len(times)}
+            for idx, label in enumerate(['wall', 'cpu']):
+                values = sorted(t[idx] for t in times)
+                value_stats = {'total': sum(values)}
+                for pct in self.percentiles:
+                    value_stats['p{}'.format(pct)] = self.percentile(values, pct)
+                value_stats['max'] = values[-1]
+                phase_stats[label] = value_stats
+            stats[name] = phase_stats
+        return stats
+
+    def report(self, file=None):
+        """
+        Prints out a table of our aggregated stats (to stderr by default).
+        Times are in milliseconds.
+        """
+        if file is None:
+            file = sys.stderr
+        stats = self.summary()
+        if not stats:
+            return
+        name_width = max(len('Phase'), *(len(name) for name in stats))
+        columns = ['total'] + ['p{}'.format(pct) for pct in self.percentiles] + ['max']
+        header = '{:<{}} {:>6}  {}  {}'.format('Phase', name_width, 'Count',
+                ' '.join('{:>9}'.format('wall ' + col) for col in columns),
+                ' '.join('{:>9}'.format('cpu ' + col) for col in columns))
+        print('', file=file)
+        print('Timing (ms)', file=file)
+        print('-----------', file=file)
+        print(header, file=file)
+        for name, phase_stats in stats.items():
+            print('{:<{}} {:>6}  {}  {}'.format(name, name_width, phase_stats['count'],
+                ' '.join('{:>9.3f}'.format(phase_stats['wall'][col]*1000) for col in columns),
+                ' '.join('{:>9.3f}'.format(phase_stats['cpu'][col]*1000) for col in columns),
+                ), file=file)
+
+# The currently-active timer, if any
+_timer = None
+
+def set_timer(timer):
+    """
+    Sets the PhaseTimer which `phase()` records to (pass `None` to turn
+    timing back off).  Returns the previously-active timer.
+    """
+    global _timer
+    previous = _timer
+    _timer = timer
+    return previous
+
+def get_timer():
+    return _timer
+
+@contextlib.contextmanager
+def timed(timer=None):
+    """
+    Activates a PhaseTimer (a new one, if not given) for the duration of the
+    `with` block, yielding it.  The previous timer is restored afterwards.
+    """
+    if timer is None:
+        timer = PhaseTimer()
+    previous = set_timer(timer)
+    try:
+        yield timer
+    finally:
+        set_timer(previous)
+
+_null_phase = contextlib.nullcontext()
+
+def phase(name):
+    """
+    Returns a context manager which times its block as the named phase, if
+    there's an active timer
+    """
+    if _timer is None:
+        return _null_phase
+    return _timer.phase(name)
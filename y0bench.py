@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# vim: set expandtab tabstop=4 shiftwidth=4:
+
+# Copyright 2021 Christopher J. Kucera
+# <cj@apocalyptech.com>
+# <http://apocalyptech.com/contact.php>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the development team nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL CJ KUCERA BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import statistics
+import contextlib
+from remotecache.cache import RemoteCache
+from y0.savegame import Savegame
+from y0.summary import summarize, report
+from y0.synthetic import write_save, write_library
+from y0.itemregistry import ItemType, reg
+
+# Benchmarks for the hot paths in the editor, run against synthetic savegames
+# (see `y0.synthetic`).  Results are written out as JSON, so runs can be
+# compared against each other.  Each benchmark is a function which takes the
+# working directory and returns a `(setup, func)` pair: `setup()` gets called
+# before every timed run (untimed), and its return value is passed to `func()`,
+# which is what's actually timed.
+
+benchmarks = {}
+
+def benchmark(name):
+    def register(func):
+        benchmarks[name] = func
+        return func
+    return register
+
+def _copy(workdir, filename):
+    """
+    Copies a savefile to a scratch filename, so runs which write to it
+    always start from the same data.
+    """
+    scratch = os.path.join(workdir, 'scratch.sav')
+    shutil.copyfile(filename, scratch)
+    return scratch
+
+@benchmark('load')
+def bench_load(workdir):
+    filename = os.path.join(workdir, 'typical.sav')
+    def run(_):
+        Savegame(filename).close()
+    return None, run
+
+@benchmark('load_mmap')
+def bench_load_mmap(workdir):
+    filename = os.path.join(workdir, 'typical.sav')
+    def run(_):
+        Savegame(filename, use_mmap=True, readonly=True).close()
+    return None, run
+
+@benchmark('info')
+def bench_info(workdir):
+    # Loading plus rendering the full (verbose, both chars) --info output
+    filename = os.path.join(workdir, 'typical.sav')
+    def run(_):
+        with Savegame(filename) as save:
+            report(summarize(save), verbose=True)
+    return None, run
+
+def _add_item(workdir, save_name):
+    filename = os.path.join(workdir, save_name)
+    weapon_id = reg.of_type(ItemType.WEP)[0].item_id
+    def setup():
+        return Savegame(filename)
+    def run(save):
+        save.kiryu.add_item_by_id(weapon_id, to_box=True)
+        save.close()
+    return setup, run
+
+@benchmark('add_item_empty_box')
+def bench_add_item_empty_box(workdir):
+    return _add_item(workdir, 'empty.sav')
+
+@benchmark('add_item_full_box')
+def bench_add_item_full_box(workdir):
+    return _add_item(workdir, 'full.sav')
+
+@benchmark('overwrite')
+def bench_overwrite(workdir):
+    filename = os.path.join(workdir, 'typical.sav')
+    def setup():
+        save = Savegame(_copy(workdir, filename))
+        save.kiryu.money.val = 1234
+        return save
+    def run(save):
+        save.overwrite()
+        save.close()
+    return setup, run
+
+@benchmark('cachefile_sync')
+def bench_cachefile_sync(workdir):
+    cache = RemoteCache(os.path.join(workdir, 'library', 'remotecache.vdf'))
+    cache_file = next(iter(cache.files.values()))
+    def run(_):
+        cache_file.sync()
+    return None, run
+
+@benchmark('remotecache_parse')
+def bench_remotecache_parse(workdir):
+    cache_filename = os.path.join(workdir, 'library', 'remotecache.vdf')
+    def run(_):
+        RemoteCache(cache_filename).files
+    return None, run
+
+@benchmark('remotecache_write')
+def bench_remotecache_write(workdir):
+    cache = RemoteCache(os.path.join(workdir, 'library', 'remotecache.vdf'))
+    cache.files
+    out_filename = os.path.join(workdir, 'remotecache-out.vdf')
+    def run(_):
+        cache.write_to(out_filename)
+    return None, run
+
+def generate(workdir, seed, library_size):
+    """
+    Writes out all the synthetic data our benchmarks use
+    """
+    write_save(os.path.join(workdir, 'typical.sav'), seed=seed)
+    write_save(os.path.join(workdir, 'empty.sav'), seed=seed, fill=0, box_fill=0)
+    write_save(os.path.join(workdir, 'full.sav'), seed=seed, fill=1, box_fill=1)
+    write_library(os.path.join(workdir, 'library'), library_size, seed=seed)
+
+def run_benchmark(name, workdir, repeat):
+    setup, func = benchmarks[name](workdir)
+    times = []
+    # Anything the code under test prints is just thrown away
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            state = setup() if setup else None
+            start = time.perf_counter()
+            func(state)
+            times.append(time.perf_counter() - start)
+    return {
+            'runs': repeat,
+            'min': min(times),
+            'median': statistics.median(times),
+            'mean': statistics.mean(times),
+            'max': max(times),
+            'stdev': statistics.stdev(times) if repeat > 1 else 0,
+            }
+
+def main():
+
+    parser = argparse.ArgumentParser(
+            description='Yakuza 0 Savefile Editor Benchmarks',
+            )
+
+    parser.add_argument('-b', '--bench',
+            action='append',
+            choices=sorted(benchmarks),
+            help="Benchmark(s) to run (can be specified more than once).  Defaults to all of them.",
+            )
+
+    parser.add_argument('-n', '--repeat',
+            type=int,
+            default=50,
+            help="Number of timed runs per benchmark",
+            )
+
+    parser.add_argument('-s', '--seed',
+            type=int,
+            default=0,
+            help="Random seed for the synthetic savegames",
+            )
+
+    parser.add_argument('--library-size',
+            type=int,
+            default=100,
+            help="Number of savefiles to describe in the synthetic remotecache.vdf",
+            )
+
+    parser.add_argument('-d', '--dir',
+            type=str,
+            help="""Directory to write the synthetic data to (it'll be left in place afterwards).
+                By default a temporary directory is used and removed afterwards.""",
+            )
+
+    parser.add_argument('-o', '--output',
+            type=str,
+            help="File to write the JSON results to (defaults to stdout)",
+            )
+
+    args = parser.parse_args()
+    if args.repeat < 1:
+        args.repeat = 1
+    if not args.bench:
+        args.bench = list(benchmarks)
+
+    if args.dir:
+        os.makedirs(args.dir, exist_ok=True)
+        workdir = args.dir
+        cleanup = None
+    else:
+        cleanup = tempfile.TemporaryDirectory(prefix='y0bench-')
+        workdir = cleanup.name
+
+    try:
+        generate(workdir, args.seed, args.library_size)
+        results = {
+                'python': platform.python_version(),
+                'implementation': platform.python_implementation(),
+                'platform': platform.platform(),
+                'seed': args.seed,
+                'repeat': args.repeat,
+                'library_size': args.library_size,
+                'unit': 'seconds',
+                'benchmarks': {},
+                }
+        for name in args.bench:
+            print('Running {}...'.format(name), file=sys.stderr)
+            results['benchmarks'][name] = run_benchmark(name, workdir, args.repeat)
+    finally:
+        if cleanup is not None:
+            cleanup.cleanup()
+
+    if args.output:
+        with open(args.output, 'w') as df:
+            json.dump(results, df, indent=2)
+            df.write('\n')
+    else:
+        print(json.dumps(results, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -27,22 +27,429 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
 # SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+import io
 import os
 import sys
 import argparse
-from remotecache.cache import RemoteCache
+import functools
+import itertools
+import contextlib
+from remotecache.cache import RemoteCache, CacheFile
 from y0 import PC
 from y0.savegame import Savegame, NotASavegameException
-from y0.itemregistry import ItemType, reg, items_by_id, items_by_name
+from y0.summary import SummaryCache, summarize, summarize_header, make_record, write_record, report as report_summary, difficulty
+from y0.itemregistry import ItemType, reg
+from y0.diff import diff_files, report as report_diff
+from y0.scan import scan, has_magic
+from y0.patch import Patch, PatchMismatchException
+from y0 import timing
+from y0.timing import phase
+
+# When we're running as a daemon (see `run_daemon()`), loaded Savegames and
+# RemoteCaches are kept around between requests, in these.
+savegame_cache = None
+remotecache_cache = None
+
+def load_savegame(filename, args):
+    """
+    Loads a savefile, or gets it from `savegame_cache` if we have it
+    """
+    readonly = not args.edits
+    if savegame_cache is None:
+        return Savegame(filename, use_mmap=args.mmap, readonly=readonly)
+    return savegame_cache.take(filename,
+            lambda: Savegame(filename, use_mmap=args.mmap, readonly=readonly),
+            variant=('mmap', readonly) if args.mmap else None)
+
+def release_savegame(save, args, written=False):
+    """
+    We're done with a savefile: keep it in `savegame_cache` if we've got one
+    (and it doesn't have any changes which haven't been written out),
+    otherwise close it.
+    """
+    if savegame_cache is None:
+        save.close()
+    elif save.df.dirty_ranges:
+        discard_savegame(save, args)
+    else:
+        savegame_cache.put(save.filename, save,
+                variant=('mmap', not args.edits) if args.mmap else None,
+                changed=written)
+
+def discard_savegame(save, args):
+    """
+    Closes a savefile which we ran into trouble with, making sure it doesn't
+    stay checked out of `savegame_cache`.
+    """
+    if savegame_cache is not None:
+        savegame_cache.forget(save.filename,
+                variant=('mmap', not args.edits) if args.mmap else None)
+    save.close()
+
+def load_remotecache(cache_filename):
+    """
+    Loads a remotecache.vdf, or gets it from `remotecache_cache` if we have it
+    """
+    if remotecache_cache is None:
+        return RemoteCache(cache_filename)
+    return remotecache_cache.take(cache_filename, lambda: RemoteCache(cache_filename))
+
+def process_file(filename, args, sync_cache=False, summary=None):
+    """
+    Does everything we've been told to do to a single savefile.  Returns a
+    `(cache_info, summary)` tuple, both of which may be `None`:
+
+    `cache_info`: if the file was updated and `sync_cache` is set, the
+        `(size, mtime, sha)` info needed to update its `remotecache.vdf`
+        entry (which is up to the caller to do).
+    `summary`: if we're using `--info-cache`, a `(stat_key, summary)` tuple
+        which can be stored in the `SummaryCache` (also up to the caller).
+
+    If a cached `summary` is passed in, and we've only been asked for info,
+    the savefile doesn't get loaded at all.
+
+    With `--format ndjson`, info is written to stdout as a single JSON record,
+    and any other messages get sent to stderr instead.
+    """
+    if args.format == 'ndjson':
+        records = sys.stdout
+        with contextlib.redirect_stdout(sys.stderr):
+            return _process_file(filename, args, sync_cache, summary, records)
+    else:
+        return _process_file(filename, args, sync_cache, summary)
+
+def apply_patch(filename, args, sync_cache):
+    """
+    Applies our `--apply-patch` patch to a single savefile, without parsing
+    it.  Returns the same `(cache_info, summary)` tuple as `process_file()`.
+    """
+    if not has_magic(filename):
+        print('ERROR: {} is not a Y0 savegame'.format(filename))
+        return None, None
+
+    filename_str = Savegame.describe_filename(filename)[2]
+    print(filename_str)
+    print('='*len(filename_str))
+    print('')
+
+    try:
+        with phase('patch'):
+            args.patch.apply(filename, check=not args.no_patch_check)
+    except PatchMismatchException as e:
+        print('ERROR: {}'.format(e))
+        print('')
+        return None, None
+    print('Applied {} change(s) from {}'.format(len(args.patch), args.apply_patch))
+    print('')
+
+    cache_info = None
+    if sync_cache:
+        with phase('cachefile sync'):
+            cache_info = CacheFile.file_info(filename)
+    return cache_info, None
+
+def _process_file(filename, args, sync_cache, summary, records=None):
+
+    # Applying a patch doesn't need anything else
+    if args.patch is not None:
+        return apply_patch(filename, args, sync_cache)
+
+    # If we've got a cached summary, and that's all we need, we're done.
+    if summary is not None:
+        with phase('info'):
+            if records:
+                write_record(records, make_record(filename, summary))
+            else:
+                filename_str = Savegame.describe_filename(filename)[2]
+                print(filename_str)
+                print('='*len(filename_str))
+                print('')
+                report_summary(summary, args.char, args.verbose)
+        return None, None
+
+    # Load the save (if we can)
+    stat_key = None
+    try:
+        if args.info_cache:
+            stat_key = SummaryCache.stat_key(filename)
+        with phase('parse'):
+            save = load_savegame(filename, args)
+    except NotASavegameException as e:
+        print('ERROR: {} is not a Y0 savegame'.format(filename))
+        if records and args.info:
+            write_record(records, {'filename': filename, 'error': 'not a Y0 savegame'})
+        return None, None
+
+    # Whatever happens while we're working on it, the save either goes back
+    # into the cache (if we're using one) or gets closed
+    try:
+        cache_info, summary, written = process_savegame(save, filename, args,
+                sync_cache, stat_key, records)
+    except BaseException:
+        discard_savegame(save, args)
+        raise
+    release_savegame(save, args, written=written)
+    return cache_info, summary
+
+def process_savegame(save, filename, args, sync_cache, stat_key, records=None):
+    """
+    The bulk of `process_file()`, once the savefile's been loaded.  Returns
+    a `(cache_info, summary, written)` tuple, `written` being whether or not
+    the savefile was updated on disk.
+    """
+    summary = None
+
+    # If we're recording a patch, keep track of every change from here on
+    if args.record_patch:
+        save.start_recording()
+
+    # Figure out what chars to process
+    chars = save.select_chars(args.char)
+
+    # Print a header no matter what, for now.
+    print(save.filename_str)
+    print('='*len(save.filename_str))
+    print('')
+
+    # Show info, if that's what we've been told to do.  If we're going to be
+    # caching the summary (or outputting NDJSON), get everything, so that it's
+    # useful regardless of which chars and verbosity get asked for next time.
+    if args.info:
+        with phase('info'):
+            if args.info_cache or records:
+                summary = summarize(save)
+            else:
+                summary = summarize(save, chars=chars, boxes=args.verbose)
+            if records:
+                write_record(records, make_record(filename, summary))
+            else:
+                report_summary(summary, args.char, args.verbose)
+
+    done_updates = False
+
+    # Update money
+    if args.money is not None:
+        with phase('money'):
+            new_money_val = max(0, min(args.money, 9999999999999))
+            for char in chars:
+                print('Setting {} money to: {:,}'.format(char.name, new_money_val))
+                char.money.val = new_money_val
+            done_updates = True
+
+    # Update CP
+    if args.cp is not None:
+        with phase('cp'):
+            # TODO: The max should probably be a hell of a lot lower than this.
+            new_cp_val = max(0, min(args.cp, 32768))
+            for char in chars:
+                print('Setting {} CP to: {:,}'.format(char.name, new_cp_val))
+                char.cp.val = new_cp_val
+            done_updates = True
+
+    # Clearing inventory
+    if args.clear_all_inventory:
+        with phase('items: clear'):
+            for char in chars:
+                print('Clearing inventory for {}'.format(char.name))
+                char.clear_non_valuables()
+            done_updates = True
+
+    # Adding items (by ID)
+    if args.add_item_id:
+        with phase('items: by id'):
+            for char in chars:
+                print('Adding inventory IDs for {}'.format(char.name))
+                # This method does its own status printing
+                char.add_items(sorted(args.add_item_id), qty=args.qty, max_qty=args.qty_max, to_box=args.box)
+            done_updates = True
+
+    # Adding items (by Name)
+    # TODO: should maybe do lookups first and then insert in numerical ID order...
+    if args.add_item_name:
+        with phase('items: by name'):
+            for char in chars:
+                print('Adding inventory names for {}'.format(char.name))
+                # This method does its own status printing
+                char.add_items(args.add_item_name, qty=args.qty, max_qty=args.qty_max, to_box=args.box)
+            done_updates = True
+
+    # Leveling and setting sales for hostess(es) (by ID)
+    if args.hostess_id:
+        with phase('hostesses: by id'):
+            for hostess_id in sorted(args.hostess_id):
+                # This method does its own status printing
+                save.hostess_roster.update_hostess_by_id(hostess_id,
+                                                         level=args.level,
+                                                         sales=args.sales,
+                                                         fast=args.fast_level)
+            done_updates = True
+
+    # Leveling and setting sales for hostess(es) (by Name)
+    if args.hostess_name:
+        with phase('hostesses: by name'):
+            for hostess_name in args.hostess_name:
+                # This method does its own status printing
+                save.hostess_roster.update_hostess_by_name(hostess_name,
+                                                           level=args.level,
+                                                           sales=args.sales,
+                                                           fast=args.fast_level)
+            done_updates = True
+
+    # Adding all Pocket Circuit
+    if args.add_all_pocket_circuit:
+        with phase('items: pocket circuit'):
+            print('Adding all Pocket Circuit parts to Kiryu')
+            # This method does its own status printing
+            save.kiryu.add_items(reg.ids_of_type(ItemType.POCKET))
+            done_updates = True
+
+    # Adding all Crafting
+    if args.add_all_crafting:
+        with phase('items: crafting'):
+            print('Adding all crafting ingredients to Majima')
+            # This method does its own status printing
+            save.majima.add_items(reg.ids_of_type(ItemType.CRAFT),
+                    max_qty=True)
+            done_updates = True
+
+    # Testing stuff
+    if args.test:
+
+            # Injecting items stupidly, by ID (ie: overwriting starting at index 0)
+            if False:
+
+                item_ids = [557]*20
+                char.clear_non_valuables()
+                for idx, item_id in enumerate(item_ids):
+                    char.add_item_by_id(item_id, force_idx=idx, max_qty=False, qty=100, to_box=False)
+                done_updates = True
+
+            # Let's put one of each non-weapon/gear/craft/pocket item in the box...
+            if False:
+                to_insert = reg.ids_of_type(ItemType.ITEM)
+
+                char.clear_non_valuables()
+                for item_id in to_insert[:200]:
+                    char.add_item_by_id(item_id, max_qty=True, to_box=True)
+                done_updates = True
+
+    # If we've done anything, write out the file
+    if done_updates:
+        print('')
+        print('Writing updated savegame')
+        with phase('overwrite'):
+            save.overwrite()
+        print('')
+    elif args.refresh:
+        print('Marking file as needing a remotecache.vdf refresh')
+        print('')
+        done_updates = True
 
-difficulty = {
-        0: 'Easy',
-        1: 'Normal',
-        2: 'Hard',
-        3: 'Legendary',
-        }
+    # Write out the patch, if we've been recording one.  This happens after
+    # the savegame's been written, so a problem with the patch can't cost us
+    # the edits themselves.
+    if args.record_patch:
+        patch = save.stop_recording()
+        try:
+            with phase('patch'):
+                patch.write_to(args.record_patch)
+            print('Recorded {} change(s) to {}'.format(len(patch), args.record_patch))
+            if args.verbose:
+                patch.report()
+        except OSError as e:
+            print('ERROR: could not write patch to {}: {}'.format(args.record_patch, e))
+        print('')
 
-def main():
+    # Gather the info needed to update remotecache.vdf, if we've been told to.
+    # Our in-memory data matches what's on disk at this point, so we can hash
+    # that rather than reading the file back in.
+    cache_info = None
+    if done_updates and sync_cache:
+        with phase('cachefile sync'):
+            cache_info = CacheFile.file_info(save.filename, size=save.size, sha=save.sha1())
+
+    # Only pass back a summary if it still describes what's on disk
+    if summary is not None and stat_key is not None and not done_updates:
+        summary = (stat_key, summary)
+    else:
+        summary = None
+
+    return cache_info, summary, done_updates
+
+def process_file_captured(filename, args, sync_cache=False, cached_summary=None):
+    """
+    Wrapper around `process_file()` for running in worker processes.  All
+    output is captured and returned alongside the cache info and summary, so
+    the parent can print everything in per-file order.  If we're profiling,
+    the timing records for the file are returned too (otherwise `None`).
+    """
+    output = io.StringIO()
+    if args.profile:
+        timer = timing.PhaseTimer()
+        timer_context = timing.timed(timer)
+    else:
+        timer = None
+        timer_context = contextlib.nullcontext()
+    with contextlib.redirect_stdout(output), timer_context:
+        with phase('file'):
+            cache_info, summary = process_file(filename, args, sync_cache, cached_summary)
+    return output.getvalue(), cache_info, summary, timer.records if timer else None
+
+def edit_options_given(args):
+    """
+    Returns `True` if any of the options which change savefiles were given,
+    so that modes which don't make changes can reject them
+    """
+    return any([
+        args.money is not None,
+        args.money_max,
+        args.cp is not None,
+        args.clear_all_inventory,
+        args.add_all_weapons,
+        args.add_all_gear,
+        args.add_all_pocket_circuit,
+        args.add_all_crafting,
+        args.add_item_id,
+        args.add_item_name,
+        args.hostess_id,
+        args.hostess_name,
+        args.level is not None,
+        args.fast_level,
+        args.sales is not None,
+        args.test,
+        args.refresh,
+        args.record_patch,
+        args.apply_patch,
+        ])
+
+def run_daemon(socket_path):
+    """
+    Runs as a daemon on the given Unix domain socket (see `y0.daemon`),
+    handling each request with `main()`
+    """
+    global savegame_cache, remotecache_cache
+
+    # Only imported when needed, to keep startup quick
+    from y0 import daemon
+
+    # Get everything we can loaded up front
+    build_parser()
+    len(reg)
+    reg.name_index
+    savegame_cache = daemon.StatCache()
+    remotecache_cache = daemon.StatCache()
+
+    print('Listening on {}'.format(socket_path))
+    try:
+        daemon.serve(socket_path, main)
+    finally:
+        savegame_cache.clear()
+        remotecache_cache.clear()
+        savegame_cache = None
+        remotecache_cache = None
+
+@functools.lru_cache(maxsize=None)
+def build_parser():
 
     parser = argparse.ArgumentParser(
             description='Yakuza 0 Savefiles',
@@ -50,10 +457,31 @@ def main():
 
     parser.add_argument('filenames',
             metavar='filename',
-            nargs='+',
+            nargs='*',
             help='Savefile(s) to parse',
             )
 
+    parser.add_argument('--diff',
+            nargs=2,
+            metavar=('A', 'B'),
+            help="""Show the differences between two savefiles, labelled with the fields they're in,
+                rather than processing any savefiles""",
+            )
+
+    parser.add_argument('--scan',
+            metavar='DIR',
+            action='append',
+            help="""Process all savegames found anywhere underneath the specified directory (such
+                as a Steam userdata dir), in addition to any specified filenames.  This option can
+                be specified more than once.""",
+            )
+
+    parser.add_argument('--ignore-volatile',
+            action='store_true',
+            help="""When using --diff, don't show differences in the areas which change every time
+                the game saves (timestamps and the like)""",
+            )
+
     ### Choosing which char(s) to act on
 
     chargroup = parser.add_mutually_exclusive_group()
@@ -93,6 +521,12 @@ def main():
             help="Show info about the specified savefiles",
             )
 
+    parser.add_argument('-l', '--list',
+            action='store_true',
+            help="""Just show a one-line summary of each savefile (current char, chapter, save
+                time, etc).  Only the very start of each file gets read in.""",
+            )
+
     parser.add_argument('-t', '--test',
             action='store_true',
             help="Do whatever testing thing I'm currently working on",
@@ -177,7 +611,9 @@ def main():
             type=str,
             action='append',
             help="""Add the specified item name(s) to the appropriate inventory area, if there is room.
-                This option can be specified more than once, and/or be a comma-separated list.""",
+                This option can be specified more than once, and/or be a comma-separated list.  Items
+                which share a name can be picked out by adding a type or source in square brackets,
+                such as "Chasu Ramen [menu] [kinryu]".""",
             )
 
     parser.add_argument('--hostess-name',
@@ -230,14 +666,171 @@ def main():
                 depending on the location.""",
             )
 
+    parser.add_argument('--record-patch',
+            type=str,
+            metavar='FILE',
+            help="""Record all the changes made to the savefile in a patch file, which can then be
+                applied to other savefiles with --apply-patch.  Only a single savefile can be
+                processed while recording.""",
+            )
+
+    parser.add_argument('--apply-patch',
+            type=str,
+            metavar='FILE',
+            help="""Apply a patch file made with --record-patch to the specified savefiles, instead
+                of making any other changes.  The savefiles don't get parsed, so this is much
+                quicker than making the same changes by hand.""",
+            )
+
+    parser.add_argument('--no-patch-check',
+            action='store_true',
+            help="""When using --apply-patch, don't check that the data being replaced matches what
+                was there when the patch was recorded""",
+            )
+
+    parser.add_argument('--mmap',
+            action='store_true',
+            help="""Memory-map savefiles rather than reading them fully into memory.  Edits are
+                made in-place in the file, and only the modified pages get written back.""",
+            )
+
+    parser.add_argument('-j', '--jobs',
+            type=int,
+            default=1,
+            help="""Process this many savefiles in parallel, using a pool of worker processes.
+                Output is still shown in the order the files were specified.""",
+            )
+
+    parser.add_argument('--format',
+            choices=['text', 'ndjson'],
+            default='text',
+            help="""Output format for --info.  With "ndjson", each savefile's info is written to
+                stdout as a single line of JSON, and all other output goes to stderr.""",
+            )
+
+    parser.add_argument('--info-cache',
+            type=str,
+            metavar='FILE',
+            help="""Cache --info summaries in the specified file.  Saves which haven't changed
+                since they were cached won't need to be re-read.""",
+            )
+
+    parser.add_argument('--profile',
+            action='store_true',
+            help="""Time each phase of processing (parsing, each kind of edit, writing, etc), and
+                show a summary of the timings (with percentiles across files) at the end, on
+                stderr.""",
+            )
+
     parser.add_argument('-v', '--verbose',
             action='store_true',
             help='Verbose output (show all available info)',
             )
 
-    # Parse args
+    parser.add_argument('--daemon',
+            type=str,
+            metavar='SOCKET',
+            help="""Run as a daemon, listening on the specified Unix domain socket for requests
+                from y0client.py (which take the same arguments as this script), rather than
+                processing any savefiles.  The item registry, and recently-used savefiles and
+                remotecache.vdf files, stay loaded between requests.""",
+            )
+
     parser.set_defaults(char=PC.Current)
-    args = parser.parse_args()
+    return parser
+
+def main(argv=None):
+    """
+    Runs the editor with the given args (by default, our command-line args).
+    Whatever happens, the active phase timer (if `--profile` sets one up) is
+    put back the way it was afterwards.
+    """
+    previous_timer = timing.get_timer()
+    try:
+        _main(argv)
+    finally:
+        timing.set_timer(previous_timer)
+
+def _main(argv):
+
+    # Parse args
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    # Running as a daemon is its own mode
+    if args.daemon:
+        if savegame_cache is not None:
+            parser.error('already running as a daemon')
+        run_daemon(args.daemon)
+        return
+
+    # Diffing is a whole separate mode
+    if args.diff:
+        if edit_options_given(args) or args.info:
+            parser.error('--diff cannot be combined with --info or any changes')
+        for filename in args.diff:
+            if not os.path.isfile(filename):
+                print('ERROR: {} not found'.format(filename))
+                return
+            if not has_magic(filename):
+                print('ERROR: {} is not a Y0 savegame'.format(filename))
+                return
+        ranges = diff_files(*args.diff)
+        print('Differences between {} and {}'.format(*args.diff))
+        print('')
+        report_diff(ranges, ignore_volatile=args.ignore_volatile)
+        return
+
+    # Add in any savegames found by scanning directories
+    scanned_caches = {}
+    if args.scan:
+        for directory in args.scan:
+            if not os.path.isdir(directory):
+                parser.error('{} is not a directory'.format(directory))
+            for result in scan(directory):
+                if result.filename not in scanned_caches:
+                    args.filenames.append(result.filename)
+                scanned_caches[result.filename] = result.remotecache
+
+    if not args.filenames:
+        if args.scan:
+            print('No savegames found')
+            return
+        parser.error('at least one savefile must be specified')
+
+    # Listing only needs the header from each file, so it's a separate
+    # (much quicker) mode as well
+    if args.list:
+        if edit_options_given(args):
+            parser.error('--list cannot be combined with any changes')
+        for filename in args.filenames:
+            try:
+                header = Savegame.open(filename, header_only=True)
+            except NotASavegameException as e:
+                print('ERROR: {} is not a Y0 savegame'.format(filename), file=sys.stderr)
+                continue
+            if args.format == 'ndjson':
+                write_record(sys.stdout, make_record(filename, summarize_header(header)))
+            else:
+                print('{}: {}, Chapter {}, {}, saved {}, played {}'.format(
+                    header.filename_str,
+                    header.cur_char,
+                    header.chapter,
+                    difficulty.get(header.difficulty, 'Unknown'),
+                    header.saved_txt,
+                    header.played_txt,
+                    ))
+        return
+
+    # If we're profiling, start timing right away.  The item registry is
+    # normally only loaded once something needs it, but for profiling it's
+    # loaded up front so it shows up as its own phase.
+    timer = None
+    if args.profile:
+        timer = timing.PhaseTimer()
+        timing.set_timer(timer)
+        with phase('registry'):
+            len(reg)
 
     # Sanity checks
     if args.money is not None and args.money < 0:
@@ -253,6 +846,8 @@ def main():
         args.level = 40
     if args.sales is not None and args.sales < 0:
         args.sales = 0
+    if args.jobs < 1:
+        args.jobs = 1
     
     
     # Some arg dependencies
@@ -308,228 +903,149 @@ def main():
         args.box = True
         if not args.add_item_id:
             args.add_item_id = []
-        for item in reg:
-            if args.add_all_weapons and item.item_type == ItemType.WEP:
-                args.add_item_id.append(item.item_id)
-            elif args.add_all_gear and item.item_type == ItemType.GEAR:
-                args.add_item_id.append(item.item_id)
+        if args.add_all_weapons:
+            args.add_item_id.extend(reg.ids_of_type(ItemType.WEP))
+        if args.add_all_gear:
+            args.add_item_id.extend(reg.ids_of_type(ItemType.GEAR))
+
+    # Figure out if we're going to be making any changes to the saves at all
+    # (if not, and we're memory-mapping, the files can be mapped read-only)
+    args.edits = any([
+        args.money is not None,
+        args.cp is not None,
+        args.clear_all_inventory,
+        args.add_item_id,
+        args.add_item_name,
+        args.hostess_id,
+        args.hostess_name,
+        args.add_all_pocket_circuit,
+        args.add_all_crafting,
+        args.test,
+        ])
+
+    # Patches are either recorded from a single save's changes, or applied
+    # instead of any other changes
+    args.patch = None
+    if args.record_patch:
+        if args.apply_patch:
+            parser.error('--record-patch and --apply-patch cannot be used together')
+        if len(args.filenames) != 1:
+            parser.error('--record-patch can only be used with a single savefile')
+        if not args.edits:
+            parser.error('--record-patch needs some changes to record')
+        patch_dir = os.path.dirname(os.path.abspath(args.record_patch))
+        if os.path.isdir(args.record_patch):
+            parser.error('--record-patch {} is a directory'.format(args.record_patch))
+        if not os.path.isdir(patch_dir):
+            parser.error('--record-patch directory {} does not exist'.format(patch_dir))
+        if not os.access(args.record_patch if os.path.exists(args.record_patch) else patch_dir, os.W_OK):
+            parser.error('--record-patch {} is not writable'.format(args.record_patch))
+    if args.apply_patch:
+        if args.edits or args.info:
+            parser.error('--apply-patch cannot be combined with other changes or --info')
+        try:
+            args.patch = Patch.load(args.apply_patch)
+        except (OSError, ValueError) as e:
+            parser.error(str(e))
 
     # (through parsing args at this point)
 
+    # When outputting NDJSON, stdout only gets the JSON records
+    if args.format == 'ndjson':
+        messages = sys.stderr
+    else:
+        messages = sys.stdout
+
     # Now, see if we can detect remotecache.vdf for these
     remotecaches = {}
     remotecache_map = {}
-    for filename in args.filenames:
-        filename_dir = os.path.abspath(os.path.dirname(filename))
-        parent_dir = os.path.abspath(os.path.join(filename_dir, '..'))
-        remotecache_file = os.path.join(parent_dir, 'remotecache.vdf')
-        if remotecache_file in remotecaches:
-            remotecache_map[filename] = remotecaches[remotecache_file]
-        else:
-            if os.path.exists(remotecache_file):
-                cache = RemoteCache(remotecache_file)
-                remotecaches[remotecache_file] = cache
-                remotecache_map[filename] = cache
+    with phase('remotecache'):
+        for filename in args.filenames:
+            if filename in scanned_caches:
+                # The scanner already found this one's remotecache.vdf (if any)
+                remotecache_file = scanned_caches[filename]
             else:
+                filename_dir = os.path.abspath(os.path.dirname(filename))
+                parent_dir = os.path.abspath(os.path.join(filename_dir, '..'))
+                remotecache_file = os.path.join(parent_dir, 'remotecache.vdf')
+                if remotecache_file not in remotecaches and not os.path.exists(remotecache_file):
+                    remotecache_file = None
+            if remotecache_file is None:
                 remotecache_map[filename] = None
+            else:
+                if remotecache_file not in remotecaches:
+                    remotecaches[remotecache_file] = load_remotecache(remotecache_file)
+                remotecache_map[filename] = remotecaches[remotecache_file]
     if args.verbose:
-        print('remotecache.vdf mappings found:')
+        print('remotecache.vdf mappings found:', file=messages)
         for filename, cache in sorted(remotecache_map.items()):
-            print('  {} -> {}'.format(filename, cache.cache_filename))
-        print('')
+            if cache is not None:
+                print('  {} -> {}'.format(filename, cache.cache_filename), file=messages)
+        print('', file=messages)
 
-    # Now loop through to do stuff
+    # Now loop through to do stuff.  remotecache.vdf updates all happen back
+    # here, even when the files themselves are processed in worker processes,
+    # so each cache only gets written once.
     caches_to_refresh = set()
-    for filename in args.filenames:
-
-        # Load the save (if we can)
-        try:
-            save = Savegame(filename)
-        except NotASavegameException as e:
-            print('ERROR: {} is not a Y0 savegame'.format(filename))
-            continue
-
-        # Figure out what chars to process
-        chars = []
-        for char in save.chars:
-            if args.char == PC.Both \
-                    or (args.char == PC.Current and save.cur_char == char.name) \
-                    or (args.char == char.chartype):
-                chars.append(char)
-
-        # Print a header no matter what, for now.
-        print(save.filename_str)
-        print('='*len(save.filename_str))
-        print('')
-
-        # Show info, if that's what we've been told to do
-        if args.info:
-
-            print('General')
-            print('-------')
-            print('Current Char: {}'.format(save.cur_char))
-            print('Chapter: {}'.format(save.chapter))
-            print('Saved on: {}'.format(save.saved_txt))
-            print('Time Played: {}'.format(save.played_txt))
-            print('Difficulty: {}'.format(difficulty[save.difficulty1.val]))
-            print('')
-
-            # Now report on character data
-            for char in chars:
-
-                print(char.name)
-                print('-'*len(char.name))
-
-                print('Money: {:,}'.format(char.money.val))
-                #print('Unknown Money 1: {:,}'.format(char.unknown_money_1.val))
-                #print('Unknown Money 2: {:,}'.format(char.unknown_money_2.val))
-                print('CP: {}'.format(char.cp.val))
-                if args.verbose:
-                    # These aren't especially interesting, really, but here they are anyway.
-                    for label, skill_spent in char.skills_spent:
-                        print('Spent on {} Style: {:,}'.format(label, skill_spent.val))
-                print('')
-
-                # Inventories
-                char.inv_item.report()
-                char.inv_weap.report()
-                char.inv_gear.report()
-                char.inv_val.report()
-                char.inv_special.report()
-                if args.verbose:
-                    char.inv_box_item.report()
-                    char.inv_box_weap.report()
-                    char.inv_box_gear.report()
-
-        done_updates = False
-
-        # Update money
-        if args.money is not None:
-            new_money_val = max(0, min(args.money, 9999999999999))
-            for char in chars:
-                print('Setting {} money to: {:,}'.format(char.name, new_money_val))
-                char.money.val = new_money_val
-            done_updates = True
-
-        # Update CP
-        if args.cp is not None:
-            # TODO: The max should probably be a hell of a lot lower than this.
-            new_cp_val = max(0, min(args.cp, 32768))
-            for char in chars:
-                print('Setting {} CP to: {:,}'.format(char.name, new_cp_val))
-                char.cp.val = new_cp_val
-            done_updates = True
-
-        # Clearing inventory
-        if args.clear_all_inventory:
-            for char in chars:
-                print('Clearing inventory for {}'.format(char.name))
-                char.clear_non_valuables()
-            done_updates = True
-
-        # Adding items (by ID)
-        if args.add_item_id:
-            for char in chars:
-                print('Adding inventory IDs for {}'.format(char.name))
-                for item_id in sorted(args.add_item_id):
-                    # This method does its own status printing
-                    char.add_item_by_id(item_id, qty=args.qty, max_qty=args.qty_max, to_box=args.box)
-            done_updates = True
-
-        # Adding items (by Name)
-        # TODO: should maybe do lookups first and then insert in numerical ID order...
-        if args.add_item_name:
-            for char in chars:
-                print('Adding inventory names for {}'.format(char.name))
-                for item_name in args.add_item_name:
-                    # This method does its own status printing
-                    char.add_item_by_name(item_name, qty=args.qty, max_qty=args.qty_max, to_box=args.box)
-            done_updates = True
-
-        # Leveling and setting sales for hostess(es) (by ID)
-        if args.hostess_id:
-            for hostess_id in sorted(args.hostess_id):
-                # This method does its own status printing
-                save.hostess_roster.update_hostess_by_id(hostess_id,
-                                                         level=args.level,
-                                                         sales=args.sales,
-                                                         fast=args.fast_level)
-            done_updates = True
-
-        # Leveling and setting sales for hostess(es) (by Name)
-        if args.hostess_name:
-            for hostess_name in args.hostess_name:
-                # This method does its own status printing
-                save.hostess_roster.update_hostess_by_name(hostess_name,
-                                                           level=args.level,
-                                                           sales=args.sales,
-                                                           fast=args.fast_level)
-            done_updates = True
-
-        # Adding all Pocket Circuit
-        if args.add_all_pocket_circuit:
-            print('Adding all Pocket Circuit parts to Kiryu')
-            for item in reg:
-                if args.add_all_pocket_circuit and item.item_type == ItemType.POCKET:
-                    # This method does its own status printing
-                    save.kiryu.add_item_by_id(item.item_id)
-            done_updates = True
+    sync_flags = [remotecache_map[filename] is not None for filename in args.filenames]
+
+    # Summaries can only stand in for the savefile if we're not doing anything
+    # but showing info.
+    summary_cache = None
+    cached_summaries = [None]*len(args.filenames)
+    if args.info_cache:
+        summary_cache = SummaryCache(args.info_cache)
+        if args.info and not args.edits and not args.refresh:
+            cached_summaries = [summary_cache.get(filename) for filename in args.filenames]
+
+    if args.jobs > 1 and len(args.filenames) > 1:
+        # Only imported when needed, to keep startup quick
+        import concurrent.futures
+        executor = concurrent.futures.ProcessPoolExecutor(max_workers=args.jobs)
+        chunksize = max(1, len(args.filenames)//(args.jobs*4))
+        with executor:
+            results = executor.map(process_file_captured,
+                    args.filenames,
+                    itertools.repeat(args),
+                    sync_flags,
+                    cached_summaries,
+                    chunksize=chunksize)
+            for filename, (output, cache_info, summary, records) in zip(args.filenames, results):
+                print(output, end='')
+                if records is not None:
+                    timer.merge(records)
+                if cache_info is not None:
+                    cache = remotecache_map[filename]
+                    caches_to_refresh.add(cache)
+                    cache[os.path.basename(filename)].update(*cache_info)
+                if summary is not None:
+                    summary_cache.put(filename, *summary)
+    else:
+        for filename, sync_cache, cached_summary in zip(args.filenames, sync_flags, cached_summaries):
+            with phase('file'):
+                cache_info, summary = process_file(filename, args, sync_cache, cached_summary)
+            if cache_info is not None:
+                cache = remotecache_map[filename]
+                caches_to_refresh.add(cache)
+                cache[os.path.basename(filename)].update(*cache_info)
+            if summary is not None:
+                summary_cache.put(filename, *summary)
 
-        # Adding all Crafting
-        if args.add_all_crafting:
-            print('Adding all crafting ingredients to Majima')
-            for item in reg:
-                if args.add_all_crafting and item.item_type == ItemType.CRAFT:
-                    # This method does its own status printing
-                    save.majima.add_item_by_id(item.item_id, max_qty=True)
-            done_updates = True
+    if summary_cache is not None:
+        summary_cache.save()
 
-        # Testing stuff
-        if args.test:
-
-                # Injecting items stupidly, by ID (ie: overwriting starting at index 0)
-                if False:
-
-                    item_ids = [557]*20
-                    char.clear_non_valuables()
-                    for idx, item_id in enumerate(item_ids):
-                        char.add_item_by_id(item_id, force_idx=idx, max_qty=False, qty=100, to_box=False)
-                    done_updates = True
-
-                # Let's put one of each non-weapon/gear/craft/pocket item in the box...
-                if False:
-                    to_insert = []
-                    for item in reg:
-                        if item.item_type == ItemType.ITEM:
-                            to_insert.append(item.item_id)
-
-                    char.clear_non_valuables()
-                    for item_id in to_insert[:200]:
-                        char.add_item_by_id(item_id, max_qty=True, to_box=True)
-                    done_updates = True
-
-        # If we've done anything, write out the file
-        if done_updates:
-            print('')
-            print('Writing updated savegame')
-            save.overwrite()
-            print('')
-        elif args.refresh:
-            print('Marking file as needing a remotecache.vdf refresh')
-            print('')
-            done_updates = True
+    for cache in caches_to_refresh:
+        with phase('remotecache write'):
+            cache.overwrite()
+        print('Updated {}'.format(cache.cache_filename), file=messages)
+        print('', file=messages)
 
-        # Update remotecache.vdf, if we've been told to
-        if done_updates:
-            cache = remotecache_map[filename]
-            if cache:
-                caches_to_refresh.add(cache)
-                cache[save.filename_short].sync()
+    if remotecache_cache is not None:
+        for cache_filename, cache in remotecaches.items():
+            remotecache_cache.put(cache_filename, cache, changed=cache in caches_to_refresh)
 
-    for cache in caches_to_refresh:
-        cache.overwrite()
-        print('Updated {}'.format(cache.cache_filename))
-        print('')
+    if timer is not None:
+        timer.report()
 
 if __name__ == '__main__':
     main()